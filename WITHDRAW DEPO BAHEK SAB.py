@@ -1,5 +1,4 @@
-@bot.command(name="help")
-async def help_command(ctx):
+def _build_help_embed() -> discord.Embed:
     embed = discord.Embed(
         title="👑 Queen Bot — Command Guide",
         description=
@@ -83,12 +82,10 @@ async def help_command(ctx):
                "• Games are provably fair (HMAC seeds and nonces shown)\n"
                "• Enable DMs for deposit/lottery/airdrop/game notifications"),
         inline=False)
-
-    await ctx.send(embed=embed)
+    return embed
 
 
-@bot.command(name="about")
-async def about_cmd(ctx):
+def _build_about_embed() -> discord.Embed:
     e = discord.Embed(
         title="👑 About Queen Bot",
         description=
@@ -117,40 +114,61 @@ async def about_cmd(ctx):
          ),
         inline=False)
     e.set_footer(text="Welcome to Quanta Coin • Powered by Solana ⚡")
-    await ctx.send(embed=e)
+    return e
+
+
+def _build_welcome_embed() -> discord.Embed:
+    # Title is templated per guild in on_guild_join
+    e = discord.Embed(
+        description=
+        ("Thanks for inviting me! I manage **Quanta Coin (QC)** and run a suite of provably‑fair games.\n\n"
+         "• `!deposit` to get your SOL address (1 QC = 0.001 SOL)\n"
+         "• `!balance`, `!withdraw <amount> <address>`, `!tip @user <amount>`\n"
+         "• `!convert <amount> <QC|SOL>` for live fiat values\n"
+         "• `!games` for all game commands\n"
+         "• `!lottery` to start a lottery; `!join` to enter\n"
+         "• `!help_fun` for faucets via fun meters"),
+        color=discord.Color.gold())
+    e.set_footer(text="Use !help to see everything • Powered by Solana ⚡")
+    return e
+
+
+# Static embeds are built once at import and kept in serialized form;
+# Embed.from_dict gives each send its own cheap copy without re-running
+# the add_field calls.
+_HELP_DICT = _build_help_embed().to_dict()
+_ABOUT_DICT = _build_about_embed().to_dict()
+_WELCOME_DICT = _build_welcome_embed().to_dict()
+
+
+@bot.command(name="help")
+async def help_command(ctx):
+    await ctx.send(embed=discord.Embed.from_dict(_HELP_DICT))
+
+
+@bot.command(name="about")
+async def about_cmd(ctx):
+    await ctx.send(embed=discord.Embed.from_dict(_ABOUT_DICT))
 
 
 @bot.event
 async def on_guild_join(guild: discord.Guild):
     # Pick a channel the bot can speak in (system channel preferred)
-    target = None
     try:
-        if guild.system_channel and guild.system_channel.permissions_for(
-                guild.me).send_messages:
-            target = guild.system_channel
+        me = guild.me
+        sys_ch = guild.system_channel
+        if sys_ch and sys_ch.permissions_for(me).send_messages:
+            target = sys_ch
         else:
-            for ch in guild.text_channels:
-                if ch.permissions_for(guild.me).send_messages:
-                    target = ch
-                    break
+            target = next((ch for ch in guild.text_channels
+                           if ch.permissions_for(me).send_messages), None)
     except Exception:
         target = None
 
     if target:
         try:
-            e = discord.Embed(
-                title=f"👑 Hello {guild.name} — I’m Queen Bot!",
-                description=
-                ("Thanks for inviting me! I manage **Quanta Coin (QC)** and run a suite of provably‑fair games.\n\n"
-                 "• `!deposit` to get your SOL address (1 QC = 0.001 SOL)\n"
-                 "• `!balance`, `!withdraw <amount> <address>`, `!tip @user <amount>`\n"
-                 "• `!convert <amount> <QC|SOL>` for live fiat values\n"
-                 "• `!games` for all game commands\n"
-                 "• `!lottery` to start a lottery; `!join` to enter\n"
-                 "• `!help_fun` for faucets via fun meters"),
-                color=discord.Color.gold())
-            e.set_footer(
-                text="Use !help to see everything • Powered by Solana ⚡")
+            e = discord.Embed.from_dict(_WELCOME_DICT)
+            e.title = f"👑 Hello {guild.name} — I’m Queen Bot!"
             await target.send(embed=e)
         except Exception:
             pass
@@ -158,7 +176,10 @@ async def on_guild_join(guild: discord.Guild):
 
 #==================end of withdraw
 
+import asyncio
+import time
 from datetime import datetime, timezone
+from typing import Optional
 import aiohttp
 import discord
 
@@ -212,9 +233,79 @@ FIAT_SYMBOLS = {
     "npr": "रु",
 }
 
+# NPR has no direct quote; it is derived from INR at cache-fill time
+NPR_PER_INR = 1.6
+
+# Display order for !convert (NPR last) as (code, CODE, symbol), resolved once
+_ALL_FIATS = tuple(SUPPORTED_FIATS) + ("npr", )
+_FIAT_TABLE = tuple((code, code.upper(), FIAT_SYMBOLS.get(code, ""))
+                    for code in _ALL_FIATS)
+
 # Choose an on-brand color for the embed
 EMBED_COLOR = discord.Color.blue()
 
+# ---------------- Shared price HTTP session ----------------
+_price_session: Optional[aiohttp.ClientSession] = None
+
+
+async def _get_price_session() -> aiohttp.ClientSession:
+    global _price_session
+    if _price_session is None or _price_session.closed:
+        _price_session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=20),
+            connector=aiohttp.TCPConnector(limit=100, ttl_dns_cache=300))
+    return _price_session
+
+
+async def close_price_session():
+    global _price_session
+    try:
+        if _price_session and not _price_session.closed:
+            await _price_session.close()
+    except Exception:
+        pass
+
+
+# ---------------- Embed timestamp ----------------
+_LAST_NOW: tuple[int, Optional[datetime]] = (0, None)
+
+
+def _now_utc_cached() -> datetime:
+    """UTC now truncated to the second; reuses one datetime per second."""
+    global _LAST_NOW
+    t = int(time.time())
+    if t != _LAST_NOW[0]:
+        _LAST_NOW = (t, datetime.fromtimestamp(t, timezone.utc))
+    return _LAST_NOW[1]
+
+
+# ---------------- Price cache ----------------
+PRICE_CACHE_TTL = 45  # seconds a fetched SOL/fiat quote stays fresh
+_PRICE_CACHE: dict[tuple, tuple[float, dict]] = {}
+_PRICE_LOCK = asyncio.Lock()
+
+
+async def _cached_sol_prices(session: aiohttp.ClientSession) -> dict:
+    """
+    Return SOL prices for SUPPORTED_FIATS (plus derived NPR), hitting the API
+    at most once per TTL. Concurrent callers queue on the lock and reuse the
+    single in-flight fetch.
+    """
+    key = tuple(SUPPORTED_FIATS)
+    hit = _PRICE_CACHE.get(key)
+    if hit and time.monotonic() - hit[0] < PRICE_CACHE_TTL:
+        return hit[1]
+    async with _PRICE_LOCK:
+        hit = _PRICE_CACHE.get(key)
+        if hit and time.monotonic() - hit[0] < PRICE_CACHE_TTL:
+            return hit[1]
+        prices = await fetch_sol_price(session, SUPPORTED_FIATS)
+        if prices:
+            inr = prices.get("inr")
+            prices["npr"] = float(inr) * NPR_PER_INR if inr is not None else None
+            _PRICE_CACHE[key] = (time.monotonic(), prices)
+        return prices
+
 
 @bot.command(name="convert")
 async def convert_cmd(ctx, amount: float, unit: str):
@@ -234,34 +325,20 @@ async def convert_cmd(ctx, amount: float, unit: str):
 
     # Fetch live prices (expects a mapping like {"usd": 123.45, "inr": 9999.0, ...})
     try:
-        async with aiohttp.ClientSession() as session:
-            prices = await fetch_sol_price(session, SUPPORTED_FIATS)
+        session = await _get_price_session()
+        prices = await _cached_sol_prices(session)
     except Exception as e:
         return await ctx.send(f"❌ Failed to fetch SOL price: {e}")
 
     if not prices:
         return await ctx.send("❌ Price lookup returned no data.")
 
-    # Prepare values
-    lines = []
-    missing = []
-    for fiat in SUPPORTED_FIATS:
-        p = prices.get(fiat)
-        if p is None:
-            missing.append(fiat.upper())
-            continue
-        value = sol_amount * float(p)
-        symbol = FIAT_SYMBOLS.get(fiat, "")
-        lines.append((fiat.upper(), f"{symbol}{value:,.2f}"))
-
-    # NPR derived from INR × 1.6
-    inr_price = prices.get("inr")
-    if inr_price is not None:
-        inr_value = sol_amount * float(inr_price)
-        npr_value = inr_value * 1.6
-        lines.append(("NPR", f"{FIAT_SYMBOLS['npr']}{npr_value:,.2f}"))
-    else:
-        lines.append(("NPR", "Unavailable (INR missing)"))
+    # Prepare values (single pass over the precomputed table)
+    quoted = [(upper, symbol, prices.get(code))
+              for code, upper, symbol in _FIAT_TABLE]
+    lines = [(upper, f"{symbol}{sol_amount * float(p):,.2f}")
+             for upper, symbol, p in quoted if p is not None]
+    missing = [upper for upper, _, p in quoted if p is None]
 
     # Build a polished embed
     qc_equiv = sol_amount / 0.001
@@ -274,7 +351,7 @@ async def convert_cmd(ctx, amount: float, unit: str):
         title=title,
         description=description,
         color=EMBED_COLOR,
-        timestamp=datetime.now(timezone.utc),
+        timestamp=_now_utc_cached(),
     )
     embed.set_author(name="Currency Converter")
     embed.set_thumbnail(
@@ -309,12 +386,15 @@ async def convert_cmd(ctx, amount: float, unit: str):
 import discord
 from discord.ext import commands
 from database import (
-    guild_mark_grandfathered,
+    bulk_mark_grandfathered,
     guild_is_grandfathered,
     guild_is_paid,
     guild_mark_paid,
     guild_mark_bypass,
     guild_access_status,
+    guild_grandfathered_ids,
+    guild_paid_ids,
+    optimize_db,
 )
 # Import your DB helpers and economy functions
 # from database import (guild_is_paid, guild_mark_paid, guild_access_status,
@@ -322,12 +402,17 @@ from database import (
 
 PAYWALL_COST_QC = 10.0
 BOT_OWNER_ID = 806561257556541470  # special ID for !invite_bypass
-PAYWALL_WHITELIST = {
+PAYWALL_WHITELIST = frozenset({
     "help", "about", "invite_pay", "invite_status", "invite_bypass", "bal",
     "deposit", "balance", "withdraw", "convert"
-}
+})
 # allowed without activation
 
+# In-process mirror of activated guilds so the global check avoids SQLite.
+# Warmed in on_ready; paid/bypass commands add to it directly.
+_GRANDFATHERED_GIDS: set[int] = set()
+_PAID_GIDS: set[int] = set()
+
 
 # 1) On startup, mark all already-joined servers as grandfathered (no pay required)
 @bot.event
@@ -335,17 +420,42 @@ async def on_ready():
     # Your existing on_ready logic...
     # Ensure DB init complete, then grandfather all guilds where the bot is currently present
     try:
-        for g in bot.guilds:
-            guild_mark_grandfathered(g.id)
+        gids = [g.id for g in bot.guilds]
+        bulk_mark_grandfathered(gids)
+        _GRANDFATHERED_GIDS.update(gids)
     except Exception as e:
         log.warning(f"[PAYWALL] Grandfather pass failed for some guilds: {e}")
 
+    try:
+        _GRANDFATHERED_GIDS.update(guild_grandfathered_ids())
+        _PAID_GIDS.update(guild_paid_ids())
+    except Exception as e:
+        log.warning(f"[PAYWALL] Could not warm access cache: {e}")
+
     log.info(
         "Premium paywall ready: existing servers are grandfathered free forever."
     )
+    log.info("SQLite journal_mode=%s",
+             _fetch_pragma_scalar(get_conn(), "journal_mode"))
+    if not getattr(bot, "_db_optimize_started", False):
+        bot.loop.create_task(_db_optimize_loop())
+        bot._db_optimize_started = True  # type: ignore[attr-defined]
+    if not getattr(bot, "_proc_sampler_started", False):
+        bot.loop.create_task(_proc_sampler())
+        bot._proc_sampler_started = True  # type: ignore[attr-defined]
     # Continue your existing on_ready tasks...
 
 
+DB_OPTIMIZE_INTERVAL = 15 * 60  # seconds
+
+
+async def _db_optimize_loop():
+    await bot.wait_until_ready()
+    while not bot.is_closed():
+        await asyncio.sleep(DB_OPTIMIZE_INTERVAL)
+        optimize_db()
+
+
 # 2) Global check: gate commands in new servers unless paid or bypassed
 @bot.check
 async def _premium_paid_gate(ctx: commands.Context) -> bool:
@@ -353,18 +463,23 @@ async def _premium_paid_gate(ctx: commands.Context) -> bool:
     if ctx.guild is None:
         return True
 
+    # Whitelisted commands never need activation
+    cmd = ctx.command
+    if cmd is not None and cmd.name in PAYWALL_WHITELIST:
+        return True
+
     gid = ctx.guild.id
 
-    # Old server: grandfathered, always allowed
-    if guild_is_grandfathered(gid):
+    # Cached activation (no DB round-trip)
+    if gid in _GRANDFATHERED_GIDS or gid in _PAID_GIDS:
         return True
 
-    # If paid/bypassed: allowed
-    if guild_is_paid(gid):
+    # Cache miss: confirm against the DB and remember positives
+    if guild_is_grandfathered(gid):
+        _GRANDFATHERED_GIDS.add(gid)
         return True
-
-    # Not paid new server: allow only whitelist
-    if ctx.command and ctx.command.name in PAYWALL_WHITELIST:
+    if guild_is_paid(gid):
+        _PAID_GIDS.add(gid)
         return True
 
     # Block and hint
@@ -411,6 +526,7 @@ async def invite_pay_cmd(ctx: commands.Context):
     except Exception:
         pass
     guild_mark_paid(gid, ctx.author.id, PAYWALL_COST_QC)
+    _PAID_GIDS.add(gid)
 
     # Premium styled confirmation
     e = discord.Embed(
@@ -510,6 +626,7 @@ async def invite_bypass_cmd(ctx: commands.Context):
 
     gid = ctx.guild.id
     guild_mark_bypass(gid, ctx.author.id)
+    _PAID_GIDS.add(gid)
     e = discord.Embed(
         title="🛡️ Premium Bypass Enabled",
         description=(f"Server: **{ctx.guild.name}**\n"
@@ -527,6 +644,7 @@ async def invite_bypass_cmd(ctx: commands.Context):
 
 import aiohttp
 import asyncio
+import time
 import discord
 from discord.ext import commands
 from datetime import datetime, timezone
@@ -548,6 +666,10 @@ async def _get_session() -> aiohttp.ClientSession:
     if _coinlib_session is None or _coinlib_session.closed:
         _coinlib_session = aiohttp.ClientSession(
             timeout=aiohttp.ClientTimeout(total=20),
+            connector=aiohttp.TCPConnector(limit=20,
+                                           limit_per_host=10,
+                                           ttl_dns_cache=300,
+                                           enable_cleanup_closed=True),
             headers={
                 "Accept": "application/json",
                 "User-Agent": "QueenBot/1.0 (+discord.py)"
@@ -555,20 +677,103 @@ async def _get_session() -> aiohttp.ClientSession:
     return _coinlib_session
 
 
-async def _coinlib_get(path: str, params: Dict[str, Any]) -> Dict[str, Any]:
+async def _coinlib_get(path: str, params: Dict[str, str]) -> Dict[str, Any]:
+    # Callers pass ready-made string params; aiohttp takes them as-is
     sess = await _get_session()
     url = f"{COINLIB_BASE}{path}"
-    q = {k: str(v) for k, v in params.items() if v is not None}
-    async with sess.get(url, params=q) as resp:
-        text = await resp.text()
+    async with sess.get(url, params=params) as resp:
         if resp.status >= 400:
+            text = await resp.text()
             raise RuntimeError(f"Coinlib {resp.status}: {text[:200]}")
         try:
-            return await resp.json()
+            return await resp.json(content_type=None)
         except Exception:
             return {}
 
 
+# ---------------- Request batching ----------------
+# Symbols requested within one window share a single comma-separated /coin
+# call per quote currency; each caller gets back only its own coin.
+TICKER_BATCH_WINDOW = 0.075  # seconds
+TICKER_BATCH_MAX = 50  # symbols per Coinlib request
+_pending: dict[str, dict[str, list[asyncio.Future]]] = {}
+_flush_tasks: dict[str, asyncio.Task] = {}
+
+
+def _coin_for_symbol(data: Dict[str, Any], sym: str) -> Optional[dict]:
+    if not isinstance(data, dict):
+        return None
+    if data.get("symbol"):
+        return data if _clean_symbol(data["symbol"]) == sym else None
+    coins = data.get("coins")
+    if isinstance(coins, list):
+        for c in coins:
+            if isinstance(c, dict) and _clean_symbol(c.get("symbol")) == sym:
+                return c
+    return None
+
+
+async def _flush_tickers(prf: str):
+    await asyncio.sleep(TICKER_BATCH_WINDOW)
+    batch = _pending.pop(prf, {})
+    _flush_tasks.pop(prf, None)
+    syms = list(batch)
+    for i in range(0, len(syms), TICKER_BATCH_MAX):
+        chunk = syms[i:i + TICKER_BATCH_MAX]
+        try:
+            data = await _coinlib_get("/coin", {
+                "key": COINLIB_KEY,
+                "symbol": ",".join(chunk),
+                "pref": prf
+            })
+        except Exception as e:
+            for sym in chunk:
+                for fut in batch[sym]:
+                    if not fut.done():
+                        fut.set_exception(e)
+            continue
+
+        remaining = data.get("remaining") if isinstance(data, dict) else None
+        for sym in chunk:
+            if isinstance(data, dict) and "error" in data:
+                result = data
+            else:
+                coin = _coin_for_symbol(data, sym)
+                result = {
+                    "coins": [coin],
+                    "remaining": remaining
+                } if coin else {}
+            for fut in batch[sym]:
+                if not fut.done():
+                    fut.set_result(result)
+
+
+async def _get_ticker(sym: str, prf: str) -> Dict[str, Any]:
+    fut = asyncio.get_running_loop().create_future()
+    _pending.setdefault(prf, {}).setdefault(sym, []).append(fut)
+    if prf not in _flush_tasks:
+        _flush_tasks[prf] = asyncio.create_task(_flush_tickers(prf))
+    return await fut
+
+
+# ---------------- Ticker cache ----------------
+TICKER_CACHE_TTL = 20  # seconds; Refresh / currency toggles reuse this window
+_TICKER_CACHE: dict[tuple[str, str], tuple[float, Dict[str, Any]]] = {}
+
+
+async def _coinlib_coin_cached(sym: str, prf: str) -> Dict[str, Any]:
+    key = (sym, prf)
+    hit = _TICKER_CACHE.get(key)
+    if hit and time.monotonic() - hit[0] < TICKER_CACHE_TTL:
+        return hit[1]
+    # Concurrent misses for the same key join the same pending batch
+    data = await _get_ticker(sym, prf)
+    # Never pin an error response for the whole TTL
+    if isinstance(data, dict) and data and "error" not in data:
+        _TICKER_CACHE[key] = (time.monotonic(), data)
+    return data
+
+
 # ---------------- Formatting helpers ----------------
 def _fmt_money(v: str | float | int, pref: str) -> str:
     sym = {"USD": "$", "EUR": "€", "INR": "₹"}.get(pref.upper(), "")
@@ -598,6 +803,16 @@ def _clean_symbol(s: str) -> str:
 
 
 # ---------------- UI Views ----------------
+# One option set per selected pref (only the default flag differs)
+_PREF_OPTIONS: dict[str, tuple[discord.SelectOption, ...]] = {
+    pref:
+    tuple(
+        discord.SelectOption(label=p, value=p, default=(p == pref))
+        for p in SUPPORTED_PREFS)
+    for pref in SUPPORTED_PREFS
+}
+
+
 class CLTickerView(discord.ui.View):
 
     def __init__(self, symbol: str, pref: str):
@@ -611,14 +826,11 @@ class CLTickerView(discord.ui.View):
 class CLPrefSelect(discord.ui.Select):
 
     def __init__(self, parent: CLTickerView):
-        opts = [
-            discord.SelectOption(label=p, value=p, default=(p == parent.pref))
-            for p in SUPPORTED_PREFS
-        ]
+        # Fresh list so add_option() on one view can't leak into the cache
         super().__init__(placeholder="Currency",
                          min_values=1,
                          max_values=1,
-                         options=opts)
+                         options=list(_PREF_OPTIONS[parent.pref]))
         self._parent = parent
 
     async def callback(self, interaction: discord.Interaction):
@@ -655,14 +867,7 @@ async def _send_coinlib_ticker(ctx_or_inter: commands.Context
         sym = _clean_symbol(symbol)
         prf = (pref or DEFAULT_PREF).upper()
 
-        data = await _coinlib_get(
-            "/coin",
-            {
-                "key": COINLIB_KEY,
-                "symbol":
-                sym,  # single symbol; Coinlib can accept comma list but we use one
-                "pref": prf
-            })
+        data = await _coinlib_coin_cached(sym, prf)
 
         if "error" in data:
             msg = f"❌ Coinlib error: {data.get('error')}"
@@ -711,7 +916,7 @@ async def _send_coinlib_ticker(ctx_or_inter: commands.Context
             title=f"{name} ({show}) • {prf}",
             description=f"Price: {_fmt_money(price, prf)}",
             color=discord.Color.blurple(),
-            timestamp=datetime.now(timezone.utc),
+            timestamp=_now_utc_cached(),
         )
         e.add_field(
             name="Change",
@@ -802,6 +1007,8 @@ async def _close_coinlib_session():
 async def shutdown_cmd(ctx):
     await ctx.reply("Shutting down…")
     await _close_coinlib_session()
+    await close_price_session()
+    optimize_db()
     await bot.close()
 
 
@@ -809,9 +1016,10 @@ async def shutdown_cmd(ctx):
 
 import sqlite3
 import time
-from datetime import datetime, timezone, timedelta
-from typing import List
+from datetime import datetime, timezone
+from typing import List, Optional
 import discord
+import numpy as np
 
 try:
     import psutil
@@ -822,36 +1030,79 @@ if not hasattr(__builtins__, "_bot_start_time"):
     __builtins__._bot_start_time = time.time()
 
 
+# ---------------- Schema ----------------
+def _stats_init_schema():
+    # users.last_deposit_at_ts itself is added by database._ensure_columns;
+    # indexing it keeps activity windows as integer range scans
+    with _transaction() as cur:
+        # Lets top-10 / rank / segmentation and last-deposit lookups use the index
+        # instead of a full scan plus temp B-tree sort
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS idx_users_balance_desc ON users(balance DESC, user_id)"
+        )
+        cur.execute("DROP INDEX IF EXISTS idx_users_last_dep")
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS idx_users_last_dep_ts ON users(last_deposit_at_ts)"
+        )
+
+
+try:
+    _stats_init_schema()
+except Exception as e:
+    log.warning(f"[STATS] Schema init at import deferred: {e}")
+
+
+_DURATION_UNITS = ((86400, "d"), (3600, "h"), (60, "m"))
+
+
 def _humanize_seconds(seconds: int) -> str:
-    if seconds < 0:
-        seconds = 0
-    d, rem = divmod(seconds, 86400)
-    h, rem = divmod(rem, 3600)
-    m, s = divmod(rem, 60)
+    s = max(0, int(seconds))
     parts = []
-    if d: parts.append(f"{d}d")
-    if h: parts.append(f"{h}h")
-    if m: parts.append(f"{m}m")
+    for div, suffix in _DURATION_UNITS:
+        v, s = divmod(s, div)
+        if v:
+            parts.append(f"{v}{suffix}")
     parts.append(f"{s}s")
     return " ".join(parts)
 
 
 def _gini(values: List[float]) -> float:
-    n = len(values)
+    a = np.fromiter((float(v) for v in values if v > 0), dtype=np.float64)
+    n = a.size
     if n == 0:
         return 0.0
-    vals = sorted(v for v in values if v >= 0.0)
-    if not vals:
-        return 0.0
-    total = sum(vals)
+    a.sort()
+    total = a.sum()
     if total <= 0:
         return 0.0
-    cum = 0.0
-    cum_sum = 0.0
-    for i, v in enumerate(vals, 1):
-        cum += v
-        cum_sum += cum
-    return max(0.0, min(1.0, 1.0 + 1.0 / n - 2.0 * (cum_sum / (n * total))))
+    # Sorted form: G = 2 * sum(i * x_i) / (n * sum(x)) - (n + 1) / n
+    ranks = np.arange(1, n + 1, dtype=np.float64)
+    g = 2.0 * np.dot(ranks, a) / (n * total) - (n + 1) / n
+    return max(0.0, min(1.0, float(g)))
+
+
+PROC_SAMPLE_INTERVAL = 5  # seconds between background psutil samples
+_PROC_STATS: dict[str, Optional[float]] = {"cpu": None, "rss": None}
+
+
+async def _proc_sampler():
+    # cpu_percent(None) measures since the previous call, so sampling here keeps
+    # the blocking interval out of !bot_stats
+    if not psutil:
+        return
+    try:
+        p = psutil.Process()
+        p.cpu_percent(interval=None)
+    except Exception as e:
+        log.warning(f"[STATS] psutil unavailable: {e}")
+        return
+    while True:
+        await asyncio.sleep(PROC_SAMPLE_INTERVAL)
+        try:
+            _PROC_STATS["cpu"] = p.cpu_percent(interval=None)
+            _PROC_STATS["rss"] = float(p.memory_info().rss)
+        except Exception:
+            pass
 
 
 def _fetch_pragma_scalar(conn: sqlite3.Connection, name: str):
@@ -864,147 +1115,183 @@ def _fetch_pragma_scalar(conn: sqlite3.Connection, name: str):
         return "?"
 
 
+# Stats statements live at module level so the text is built once and the
+# connection's statement cache keeps them prepared between invocations
+_SQL_STATS_USERS = """
+    SELECT COUNT(*) AS total_users,
+           SUM(balance) AS circ,
+           SUM(total_depo) AS depo,
+           SUM(total_withdraw) AS withd,
+           SUM(net_profit_loss) AS pl_sum,
+           SUM(total_wagered) AS wager_sum,
+           SUM(total_sol_deposited) AS sol_sum,
+           COUNT(CASE WHEN user_id != :bot THEN 1 END) AS n_users,
+           AVG(CASE WHEN user_id != :bot THEN balance END) AS avg_bal,
+           COUNT(CASE WHEN user_id != :bot AND balance > 0 THEN 1 END) AS nonzero,
+           COUNT(CASE WHEN user_id != :bot AND balance >= 1000 THEN 1 END) AS whales,
+           COUNT(CASE WHEN user_id != :bot AND balance > 0 AND balance <= 1 THEN 1 END) AS minnows,
+           COUNT(CASE WHEN last_deposit_at_ts >= :week THEN 1 END) AS act_week,
+           COUNT(CASE WHEN last_deposit_at_ts >= :today THEN 1 END) AS act_today
+    FROM users
+"""
+_SQL_STATS_MEDIAN = """
+    SELECT AVG(balance) AS m FROM (
+        SELECT balance FROM users WHERE user_id != ?
+        ORDER BY balance LIMIT ? OFFSET ?)
+"""
+# Allison's sorted form: G = 1 + 1/N - 2 * sum((N - i + 1) * x_i) / (N * sum(x))
+_SQL_STATS_GINI = """
+    SELECT COUNT(*) AS n,
+           SUM((cnt - rn + 1) * balance) * 2.0
+               / (COUNT(*) * SUM(balance)) AS r
+    FROM (SELECT balance,
+                 ROW_NUMBER() OVER (ORDER BY balance) AS rn,
+                 COUNT(*) OVER () AS cnt
+          FROM users WHERE user_id != ? AND balance > 0)
+"""
+_SQL_STATS_POSITIVE_BALANCES = "SELECT balance FROM users WHERE user_id != ? AND balance > 0"
+_SQL_STATS_TOP10 = "SELECT user_id, balance FROM users WHERE user_id != ? ORDER BY balance DESC LIMIT 10"
+_SQL_STATS_TOP10_AGG = """
+    SELECT SUM(balance) AS s, MAX(balance) AS m FROM (
+        SELECT balance FROM users WHERE user_id != ?
+        ORDER BY balance DESC LIMIT 10)
+"""
+_SQL_STATS_RECENT_DEPOSITS = """
+    SELECT user_id, last_deposit_at, last_deposit_signature
+    FROM users
+    WHERE last_deposit_at_ts IS NOT NULL
+    ORDER BY last_deposit_at_ts DESC
+    LIMIT 3
+"""
+_SQL_STATS_REWARDS_TODAY = "SELECT COUNT(*) AS c FROM user_rewards WHERE last_reward = ?"
+_SQL_STATS_LOTTERY = """
+    SELECT COUNT(CASE WHEN status='active' THEN 1 END) AS active,
+           SUM(pot) AS pot_total,
+           (SELECT COUNT(*) FROM lottery_entries) AS entries
+    FROM lottery
+"""
+_SQL_STATS_LAST_WINNER = "SELECT winner_id, pot FROM lottery WHERE winner_id IS NOT NULL ORDER BY id DESC LIMIT 1"
+_SQL_STATS_SCHEMA_VERSION = "SELECT value FROM meta WHERE key='schema_version'"
+
+MEDALS = ("🥇", "🥈", "🥉", "4️⃣", "5️⃣", "6️⃣", "7️⃣", "8️⃣", "9️⃣", "🔟")
+
+STATS_CACHE_TTL = 15  # seconds
+_STATS_CACHE: tuple[float, Optional[dict]] = (0.0, None)
+_STATS_LOCK = asyncio.Lock()
+
+
 @bot.command(name="bot_stats")
 async def bot_stats_cmd(ctx):
+    global _STATS_CACHE
     if ctx.author.id != 806561257556541470:
         return await ctx.send(
             "❌ You do not have permission to use this command.")
 
+    ts, data = _STATS_CACHE
+    if data is None or time.monotonic() - ts >= STATS_CACHE_TTL:
+        # Concurrent callers wait on one rebuild, then share the snapshot
+        async with _STATS_LOCK:
+            ts, data = _STATS_CACHE
+            if data is None or time.monotonic() - ts >= STATS_CACHE_TTL:
+                data = _build_stats_embed().to_dict()
+                _STATS_CACHE = (time.monotonic(), data)
+    await ctx.send(embed=discord.Embed.from_dict(data))
+
+
+def _build_stats_embed() -> discord.Embed:
     conn = get_conn()
 
     # Core aggregates
     bot_row = fetch_user(bot.user.id)
     bot_balance = float(bot_row["balance"])
 
-    row = conn.execute("SELECT COUNT(*) AS c FROM users").fetchone()
-    total_users = int(row["c"] if row and row["c"] is not None else 0)
-
-    row = conn.execute("SELECT SUM(balance) AS s FROM users").fetchone()
-    total_qc_circ = float(row["s"] if row and row["s"] is not None else 0.0)
-
-    totals = conn.execute(
-        "SELECT SUM(total_depo) AS depo, SUM(total_withdraw) AS withd FROM users"
-    ).fetchone()
-    total_depo = float(
-        totals["depo"] if totals and totals["depo"] is not None else 0.0)
-    total_withdraw = float(
-        totals["withd"] if totals and totals["withd"] is not None else 0.0)
-
-    # Users (excluding bot)
-    row = conn.execute(
-        "SELECT AVG(balance) AS avg_bal FROM users WHERE user_id != ?",
-        (bot.user.id, )).fetchone()
-    avg_user_balance = float(
-        row["avg_bal"] if row and row["avg_bal"] is not None else 0.0)
-
-    # Median (excluding bot)
+    # Activity window boundaries in epoch seconds (last deposit as proxy)
+    now_ts = int(time.time())
+    today_start = now_ts - now_ts % 86400
+    week_ago = now_ts - 7 * 86400
+
+    # Every per-user aggregate in a single scan of users
+    agg = conn.execute(
+        _SQL_STATS_USERS, {
+            "bot": bot.user.id,
+            "week": week_ago,
+            "today": today_start,
+        }).fetchone()
+
+    total_users = int(agg["total_users"] or 0)
+    total_qc_circ = float(agg["circ"] or 0.0)
+    total_depo = float(agg["depo"] or 0.0)
+    total_withdraw = float(agg["withd"] or 0.0)
+    net_pl_sum = float(agg["pl_sum"] or 0.0)
+    total_wagered = float(agg["wager_sum"] or 0.0)
+    total_sol_deposited = float(agg["sol_sum"] or 0.0)
+    n_users = int(agg["n_users"] or 0)
+    avg_user_balance = float(agg["avg_bal"] or 0.0)
+    nonzero_users = int(agg["nonzero"] or 0)
+    whales = int(agg["whales"] or 0)
+    minnows = int(agg["minnows"] or 0)
+    new_users_7d = active_7d = int(agg["act_week"] or 0)
+    new_users_today = active_today = int(agg["act_today"] or 0)
+
+    # Median (excluding bot): average the middle one or two rows
     try:
-        rows = conn.execute(
-            "SELECT balance FROM users WHERE user_id != ? ORDER BY balance",
-            (bot.user.id, )).fetchall()
-        balances = [float(r["balance"]) for r in rows]
-        n = len(balances)
-        if n == 0:
-            median_balance = 0.0
-        elif n % 2 == 1:
-            median_balance = balances[n // 2]
+        if n_users:
+            row = conn.execute(_SQL_STATS_MEDIAN,
+                               (bot.user.id, 2 - n_users % 2,
+                                (n_users - 1) // 2)).fetchone()
+            median_balance = float(row["m"] or 0.0)
         else:
-            median_balance = (balances[n // 2 - 1] + balances[n // 2]) / 2.0
+            median_balance = 0.0
     except Exception:
-        balances = []
         median_balance = 0.0
 
-    row = conn.execute(
-        "SELECT COUNT(*) AS c FROM users WHERE user_id != ? AND balance > 0",
-        (bot.user.id, )).fetchone()
-    nonzero_users = int(row["c"] if row and row["c"] is not None else 0)
-
     # Gini and concentration metrics (exclude bot)
-    if not balances:
+    try:
+        row = conn.execute(_SQL_STATS_GINI, (bot.user.id, )).fetchone()
+        g_n = int(row["n"] or 0)
+        gini = (max(0.0, min(1.0, 1.0 + 1.0 / g_n - float(row["r"])))
+                if g_n and row["r"] is not None else 0.0)
+    except sqlite3.OperationalError:
+        # SQLite < 3.25 has no window functions; compute in Python instead
         try:
-            bal_rows = conn.execute(
-                "SELECT balance FROM users WHERE user_id != ?",
-                (bot.user.id, )).fetchall()
-            balances = [float(r["balance"]) for r in bal_rows]
+            bal_rows = conn.execute(_SQL_STATS_POSITIVE_BALANCES,
+                                    (bot.user.id, )).fetchall()
+            gini = _gini([float(r["balance"]) for r in bal_rows])
         except Exception:
-            balances = []
-    gini = _gini([b for b in balances if b > 0])
+            gini = 0.0
 
     try:
-        top_rows = conn.execute(
-            "SELECT user_id, balance FROM users WHERE user_id != ? ORDER BY balance DESC LIMIT 10",
-            (bot.user.id, )).fetchall()
+        top_rows = conn.execute(_SQL_STATS_TOP10, (bot.user.id, )).fetchall()
     except Exception:
         top_rows = []
 
     top10_conc = 0.0
     largest_share_pct = 0.0
     if total_qc_circ > 0 and top_rows:
-        top_sum = sum(float(r["balance"]) for r in top_rows)
-        top10_conc = (top_sum / total_qc_circ) * 100.0
-        largest_share_pct = (float(top_rows[0]["balance"]) /
-                             total_qc_circ) * 100.0
-
-    # Net P/L totals and wagering
-    pl_totals = conn.execute(
-        "SELECT SUM(net_profit_loss) AS pl_sum, SUM(total_wagered) AS wager_sum FROM users"
-    ).fetchone()
-    net_pl_sum = float(pl_totals["pl_sum"] if pl_totals
-                       and pl_totals["pl_sum"] is not None else 0.0)
-    total_wagered = float(pl_totals["wager_sum"] if pl_totals
-                          and pl_totals["wager_sum"] is not None else 0.0)
-
-    # SOL tracking — always show section; add robust recent list
-    row = conn.execute(
-        "SELECT SUM(total_sol_deposited) AS sol_sum FROM users").fetchone()
-    try:
-        total_sol_deposited = float(
-            row["sol_sum"]) if row and row["sol_sum"] is not None else 0.0
-    except Exception:
-        total_sol_deposited = 0.0
-
-    last_dep = conn.execute("""
-        SELECT user_id, last_deposit_at, last_deposit_signature
-        FROM users
-        WHERE last_deposit_at IS NOT NULL
-        ORDER BY last_deposit_at DESC
-        LIMIT 1
-    """).fetchone()
-
-    # Also fetch a small recent list to prove activity
-    recent_rows = conn.execute("""
-        SELECT user_id, last_deposit_at
-        FROM users
-        WHERE last_deposit_at IS NOT NULL
-        ORDER BY last_deposit_at DESC
-        LIMIT 3
-    """).fetchall()
+        row = conn.execute(_SQL_STATS_TOP10_AGG, (bot.user.id, )).fetchone()
+        top10_conc = (float(row["s"] or 0.0) / total_qc_circ) * 100.0
+        largest_share_pct = (float(row["m"] or 0.0) / total_qc_circ) * 100.0
+
+    # SOL tracking — always show section; the newest of the recent list
+    # doubles as the "last deposit"
+    recent_rows = conn.execute(_SQL_STATS_RECENT_DEPOSITS).fetchall()
+    last_dep = recent_rows[0] if recent_rows else None
 
     # Rewards stats
     try:
         today = datetime.utcnow().date().isoformat()
-        row = conn.execute(
-            "SELECT COUNT(*) AS c FROM user_rewards WHERE last_reward = ?",
-            (today, )).fetchone()
+        row = conn.execute(_SQL_STATS_REWARDS_TODAY, (today, )).fetchone()
         rewards_today = int(row["c"] if row and row["c"] is not None else 0)
     except Exception:
         rewards_today = 0
 
     # Lottery stats
     try:
-        row = conn.execute(
-            "SELECT COUNT(*) AS c FROM lottery WHERE status='active'"
-        ).fetchone()
-        lot_active = int(row["c"] if row and row["c"] is not None else 0)
-        row = conn.execute("SELECT SUM(pot) AS s FROM lottery").fetchone()
-        lot_pot_total = float(
-            row["s"] if row and row["s"] is not None else 0.0)
-        row = conn.execute(
-            "SELECT COUNT(*) AS c FROM lottery_entries").fetchone()
-        lot_entries = int(row["c"] if row and row["c"] is not None else 0)
-        last_winner_row = conn.execute(
-            "SELECT winner_id, pot FROM lottery WHERE winner_id IS NOT NULL ORDER BY id DESC LIMIT 1"
-        ).fetchone()
+        row = conn.execute(_SQL_STATS_LOTTERY).fetchone()
+        lot_active = int(row["active"] or 0)
+        lot_pot_total = float(row["pot_total"] or 0.0)
+        lot_entries = int(row["entries"] or 0)
+        last_winner_row = conn.execute(_SQL_STATS_LAST_WINNER).fetchone()
         if last_winner_row:
             last_winner = int(last_winner_row["winner_id"])
             last_winner_pot = float(last_winner_row["pot"] or 0.0)
@@ -1025,57 +1312,16 @@ async def bot_stats_cmd(ctx):
                            total_withdraw) if total_withdraw else None
     ratio_str = f"{depo_withdraw_ratio:.2f}x" if depo_withdraw_ratio else "—"
 
-    # Activity from last_deposit_at as proxy
-    try:
-        now = datetime.utcnow()
-        today_start = datetime(now.year, now.month, now.day)
-        week_ago = now - timedelta(days=7)
-
-        row = conn.execute(
-            "SELECT COUNT(*) AS c FROM users WHERE last_deposit_at >= ?",
-            (week_ago.isoformat(), )).fetchone()
-        new_users_7d = int(row["c"] if row and row["c"] is not None else 0)
-
-        row = conn.execute(
-            "SELECT COUNT(*) AS c FROM users WHERE last_deposit_at >= ?",
-            (today_start.isoformat(), )).fetchone()
-        new_users_today = int(row["c"] if row and row["c"] is not None else 0)
-
-        active_7d = new_users_7d
-        active_today = new_users_today
-    except Exception:
-        new_users_7d = 0
-        new_users_today = 0
-        active_7d = 0
-        active_today = 0
-
-    # Whale/minnow segmentation
-    row = conn.execute(
-        "SELECT COUNT(*) AS c FROM users WHERE user_id != ? AND balance >= 1000",
-        (bot.user.id, )).fetchone()
-    whales = int(row["c"] if row and row["c"] is not None else 0)
-
-    row = conn.execute(
-        "SELECT COUNT(*) AS c FROM users WHERE user_id != ? AND balance > 0 AND balance <= 1",
-        (bot.user.id, )).fetchone()
-    minnows = int(row["c"] if row and row["c"] is not None else 0)
-
     # Uptime and process metrics
     uptime_seconds = int(time.time() -
                          getattr(__builtins__, "_bot_start_time", time.time()))
     uptime_human = _humanize_seconds(uptime_seconds)
 
     mem_used_str = cpu_used_str = "—"
-    try:
-        if psutil:
-            p = psutil.Process()
-            mem_info = p.memory_info()
-            mem_used_str = f"{mem_info.rss / (1024*1024):.1f} MB"
-            p.cpu_percent(interval=None)
-            cpu_pct = p.cpu_percent(interval=0.1)
-            cpu_used_str = f"{cpu_pct:.1f}%"
-    except Exception:
-        pass
+    if _PROC_STATS["rss"] is not None:
+        mem_used_str = f"{_PROC_STATS['rss'] / (1024*1024):.1f} MB"
+    if _PROC_STATS["cpu"] is not None:
+        cpu_used_str = f"{_PROC_STATS['cpu']:.1f}%"
 
     # DB PRAGMAs
     journal_mode = _fetch_pragma_scalar(conn, "journal_mode")
@@ -1084,8 +1330,7 @@ async def bot_stats_cmd(ctx):
     cache_size = _fetch_pragma_scalar(conn, "cache_size")
     busy_timeout = _fetch_pragma_scalar(conn, "busy_timeout")
 
-    row = conn.execute(
-        "SELECT value FROM meta WHERE key='schema_version'").fetchone()
+    row = conn.execute(_SQL_STATS_SCHEMA_VERSION).fetchone()
     schema_ver = (row["value"] if row else "unknown")
 
     # Build embed
@@ -1177,15 +1422,11 @@ async def bot_stats_cmd(ctx):
 
     # Leaderboard (Top 10)
     if top_rows:
-        medals = ["🥇", "🥈", "🥉", "4️⃣", "5️⃣", "6️⃣", "7️⃣", "8️⃣", "9️⃣", "🔟"]
-        lb_lines = []
-        for i, r in enumerate(top_rows, 0):
-            uid = r["user_id"]
-            bal = float(r["balance"])
-            m = medals[i] if i < len(medals) else f"{i+1}."
-            lb_lines.append(f"{m} <@{uid}> — `{bal:,.3f} QC`")
+        # top_rows is LIMIT 10, so every row has a medal
         embed.add_field(name="🏅 Top Holders",
-                        value="\n".join(lb_lines),
+                        value="\n".join(
+                            f"{m} <@{r['user_id']}> — `{r['balance']:,.3f} QC`"
+                            for m, r in zip(MEDALS, top_rows)),
                         inline=False)
     else:
         embed.add_field(name="🏅 Top Holders",
@@ -1193,8 +1434,8 @@ async def bot_stats_cmd(ctx):
                         inline=False)
 
     # System / Uptime / Process
-    fk_flag = "ON" if str(_fetch_pragma_scalar(
-        conn, "foreign_keys")).lower() in ("1", "on", "true") else "OFF"
+    fk_flag = "ON" if str(foreign_keys).lower() in ("1", "on",
+                                                     "true") else "OFF"
     embed.add_field(name="🕒 Uptime", value=f"`{uptime_human}`", inline=True)
 
     mem_cpu = f"• Memory: `{mem_used_str}`\n• CPU: `{cpu_used_str}`"
@@ -1212,10 +1453,8 @@ async def bot_stats_cmd(ctx):
 
     # Risk flags
     risk_msgs = []
-    if bot_share_pct := (bot_balance / total_qc_circ *
-                         100.0) if total_qc_circ else 0.0:
-        if bot_share_pct >= 50:
-            risk_msgs.append("High treasury dominance (≥50%).")
+    if bot_share_pct >= 50:
+        risk_msgs.append("High treasury dominance (≥50%).")
     if top10_conc >= 70:
         risk_msgs.append("High top-10 concentration (≥70%).")
     if gini >= 0.9:
@@ -1227,24 +1466,50 @@ async def bot_stats_cmd(ctx):
 
     embed.set_footer(
         text="System snapshot • All values computed from local database")
-    await ctx.send(embed=embed)
+    return embed
 
 
 # ===== PROFILE PRIVACY FEATURE =====
-_profile_privacy = set()  # store user IDs who have privacy enabled
+import functools
+
+
+# user_prefs is created by database.ensure_user_prefs_table during get_conn()
+
+
+@functools.lru_cache(maxsize=4096)
+def _profile_is_private(user_id: int) -> bool:
+    row = get_conn().execute("SELECT private FROM user_prefs WHERE user_id=?",
+                             (user_id, )).fetchone()
+    return bool(row and row[0])
+
+
+def _profile_set_private(user_id: int, private: bool):
+    with _transaction() as cur:
+        cur.execute(
+            "INSERT OR REPLACE INTO user_prefs (user_id, private) VALUES (?,?)",
+            (user_id, int(private)))
+    # Toggles are rare; dropping the whole cache keeps invalidation trivial
+    _profile_is_private.cache_clear()
+
+
+# Range count served by idx_users_balance_desc
+_SQL_PROFILE_RANK = "SELECT COUNT(*) + 1 FROM users WHERE balance > ?"
+
+_PROFILE_FIAT_SYMBOLS = (("usd", "$"), ("eur", "€"), ("gbp", "£"),
+                         ("aud", "A$"), ("inr", "₹"))
 
 
 @bot.command(name="profile_restrict")
 async def profile_restrict_cmd(ctx):
     """Toggle profile view restriction for yourself."""
     uid = ctx.author.id
-    if uid in _profile_privacy:
-        _profile_privacy.remove(uid)
+    if _profile_is_private(uid):
+        _profile_set_private(uid, False)
         await ctx.send(
             "🔓 Your profile is now **public**. Others can view it with `!profile @you`."
         )
     else:
-        _profile_privacy.add(uid)
+        _profile_set_private(uid, True)
         await ctx.send(
             "🔒 Your profile is now **private**. Others cannot view it with `!profile @you`."
         )
@@ -1261,7 +1526,7 @@ async def profile_cmd(ctx, member: discord.Member = None):
     # After you've retrieved the profile target (example variable name "target_user")
 
     # Privacy check: block viewing others if they've set profile to private
-    if target.id != ctx.author.id and target.id in _profile_privacy:
+    if target.id != ctx.author.id and _profile_is_private(target.id):
         return await ctx.send(
             f"🔒 {target.display_name} has set their profile to private.")
 
@@ -1298,36 +1563,22 @@ async def profile_cmd(ctx, member: discord.Member = None):
                 pass
 
         # Rank by QC balance
-        rank = None
         try:
-            conn = get_conn()
-            row = conn.execute(
-                "SELECT COUNT(*) + 1 AS rank FROM users WHERE balance > ?",
-                (qc_bal, )).fetchone()
-            if row:
-                # sqlite3.Row or dict-like; handle both
-                rank = row["rank"] if isinstance(row, dict) or hasattr(
-                    row, "keys") else row[0]
+            rank = get_conn().execute(_SQL_PROFILE_RANK,
+                                      (qc_bal, )).fetchone()[0]
         except Exception:
             rank = "—"
 
         # Live SOL price to fiat conversions (best-effort)
         fiat_lines = []
         try:
-            async with aiohttp.ClientSession() as session:
-                prices = await fetch_sol_price(session, SUPPORTED_FIATS)
-                symbols = {
-                    "usd": "$",
-                    "eur": "€",
-                    "gbp": "£",
-                    "aud": "A$",
-                    "inr": "₹"
-                }
-                for fiat, symbol in symbols.items():
-                    p = prices.get(fiat)
-                    if p:
-                        fiat_lines.append(
-                            f"{fiat.upper()}: {symbol}{sol_equiv * p:,.2f}")
+            session = await _get_price_session()
+            prices = await _cached_sol_prices(session)
+            for fiat, symbol in _PROFILE_FIAT_SYMBOLS:
+                p = prices.get(fiat)
+                if p:
+                    fiat_lines.append(
+                        f"{fiat.upper()}: {symbol}{sol_equiv * p:,.2f}")
         except Exception:
             pass
 
@@ -1401,6 +1652,7 @@ async def profile_cmd(ctx, member: discord.Member = None):
 # ========= FLEXIBLE LOTTERY (persistent, variable cost/duration, auto-payout with DM) =========
 import asyncio
 import random
+import re
 import sqlite3
 import time
 from datetime import datetime, timezone
@@ -1431,6 +1683,12 @@ def _lottery_init_schema():
             FOREIGN KEY(lottery_id) REFERENCES lottery(id)
         )
         """)
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS idx_lottery_status_id ON lottery(status, id DESC)"
+        )
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS idx_lottery_entries_lid ON lottery_entries(lottery_id)"
+        )
 
 
 # Try to initialize immediately (safe if DB not yet ready; will retry later)
@@ -1445,6 +1703,10 @@ def _utc_now() -> int:
 
 
 # ---------------- Helpers ----------------
+_DUR_RE = re.compile(r"^([0-9]*\.?[0-9]+)\s*([smhdw]?)$")
+_DUR_UNITS = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+
 def _parse_duration_to_seconds(s: str) -> int:
     """
     Accepts:
@@ -1455,21 +1717,14 @@ def _parse_duration_to_seconds(s: str) -> int:
     s = s.strip().lower()
     if not s:
         raise ValueError("Duration is required.")
-    if s.isdigit():
-        val = int(s)
-        if val <= 0:
-            raise ValueError("Duration must be positive.")
-        return val
-    units = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
-    try:
-        num = float(s[:-1])
-        suffix = s[-1]
-        if suffix not in units or num <= 0:
-            raise ValueError
-        return int(num * units[suffix])
-    except Exception:
+    m = _DUR_RE.match(s)
+    if not m:
         raise ValueError(
             "Invalid duration. Use 30s, 10m, 1h, 2d, 1w, or seconds.")
+    secs = int(float(m.group(1)) * _DUR_UNITS[m.group(2)])
+    if secs <= 0:
+        raise ValueError("Duration must be positive.")
+    return secs
 
 
 def _lottery_get_open() -> dict | None:
@@ -1497,13 +1752,6 @@ def _lottery_create(entry_cost: float, duration_seconds: int,
         return cur.lastrowid
 
 
-def _lottery_add_entry(lottery_id: int, user_id: int):
-    with _transaction() as cur:
-        cur.execute(
-            "INSERT INTO lottery_entries (lottery_id, user_id, created_at) VALUES (?,?,?)",
-            (lottery_id, user_id, _utc_now()))
-
-
 def _lottery_fetch_entries(lottery_id: int) -> list[int]:
     rows = get_conn().execute(
         "SELECT user_id FROM lottery_entries WHERE lottery_id=?",
@@ -1511,10 +1759,30 @@ def _lottery_fetch_entries(lottery_id: int) -> list[int]:
     return [r["user_id"] if hasattr(r, "keys") else r[0] for r in rows]
 
 
-def _lottery_increment_pot(lottery_id: int, delta_qc: float):
+def _lottery_pick_winner(lottery_id: int) -> int | None:
+    row = get_conn().execute(
+        "SELECT user_id FROM lottery_entries WHERE lottery_id=? ORDER BY RANDOM() LIMIT 1",
+        (lottery_id, )).fetchone()
+    return int(row[0]) if row else None
+
+
+def _lottery_join_atomic(user_id: int, bot_id: int, cost: float,
+                         lottery_id: int):
+    """Charge the entry, credit the house, record the ticket and grow the pot in one commit."""
+    cost = float(cost)
     with _transaction() as cur:
+        cur.execute(
+            "UPDATE users SET balance = balance - ?, total_wagered = total_wagered + ? "
+            "WHERE user_id=?", (cost, cost, user_id))
+        cur.execute("INSERT OR IGNORE INTO users (user_id) VALUES (?)",
+                    (bot_id, ))
+        cur.execute("UPDATE users SET balance = balance + ? WHERE user_id=?",
+                    (cost, bot_id))
+        cur.execute(
+            "INSERT INTO lottery_entries (lottery_id, user_id, created_at) VALUES (?,?,?)",
+            (lottery_id, user_id, _utc_now()))
         cur.execute("UPDATE lottery SET pot = pot + ? WHERE id=?",
-                    (float(delta_qc), lottery_id))
+                    (cost, lottery_id))
 
 
 def _lottery_mark_settled(lottery_id: int, winner_id: int | None):
@@ -1537,6 +1805,28 @@ def _lottery_time_left(ends_at_epoch: int) -> str:
 
 
 # ---------------- Settlement Loop ----------------
+LOTTERY_IDLE_POLL = 60  # seconds to sleep when no lottery is open
+
+# Set by !lottery so the settlement loop re-reads the next deadline at once
+_LOTTERY_WAKE = asyncio.Event()
+
+
+def _lottery_next_end() -> int | None:
+    row = get_conn().execute(
+        "SELECT MIN(ends_at) FROM lottery WHERE status='open'").fetchone()
+    return int(row[0]) if row and row[0] is not None else None
+
+
+async def _lottery_sleep_until_next():
+    _LOTTERY_WAKE.clear()
+    next_end = _lottery_next_end()
+    delay = max(1, next_end - _utc_now()) if next_end else LOTTERY_IDLE_POLL
+    try:
+        await asyncio.wait_for(_LOTTERY_WAKE.wait(), timeout=delay)
+    except asyncio.TimeoutError:
+        pass
+
+
 async def _lottery_settlement_loop():
     await bot.wait_until_ready()
     # Ensure schema again when bot is fully ready
@@ -1549,13 +1839,10 @@ async def _lottery_settlement_loop():
         try:
             lot = _lottery_get_open()
             if lot and _utc_now() >= int(lot["ends_at"]):
-                entries = _lottery_fetch_entries(lot["id"])
-                winner_id = None
+                winner_id = _lottery_pick_winner(lot["id"])
                 pot = float(lot["pot"] or 0.0)
 
-                if entries:
-                    winner_id = random.choice(entries)
-
+                if winner_id is not None:
                     # Pay the pot from bot balance to winner
                     if pot > 0:
                         bot_bal = fetch_user(bot.user.id)["balance"]
@@ -1591,7 +1878,7 @@ async def _lottery_settlement_loop():
                 except Exception as e:
                     log.warning(f"[LOTTERY] Channel announce failed: {e}")
 
-            await asyncio.sleep(5)
+            await _lottery_sleep_until_next()
         except Exception as e:
             log.error(f"[LOTTERY] Settlement loop error: {e}")
             await asyncio.sleep(5)
@@ -1630,6 +1917,7 @@ async def lottery_cmd(ctx, entry_cost: float = 1.0, duration: str = "10m"):
     lot_id = _lottery_create(entry_cost=float(entry_cost),
                              duration_seconds=secs,
                              channel_id=ctx.channel.id)
+    _LOTTERY_WAKE.set()
     lot = _lottery_get_by_id(lot_id)
     ends_at = int(lot["ends_at"])
     await ctx.send(f"🎉 Lottery started!\n"
@@ -1656,11 +1944,7 @@ async def join_cmd(ctx):
         return await ctx.send(f"❌ Insufficient QC. Need {cost:.6f} QC.")
 
     try:
-        update_balance(uid, -cost)
-        update_balance(bot.user.id, cost)
-        update_stats(uid, total_wagered=cost)
-        _lottery_add_entry(lot["id"], uid)
-        _lottery_increment_pot(lot["id"], cost)
+        _lottery_join_atomic(uid, bot.user.id, cost, lot["id"])
     except Exception as e:
         return await ctx.send(f"❌ Failed to join lottery: {e}")
     ends_at = int(lot["ends_at"])
@@ -1709,7 +1993,9 @@ except Exception as e:
     log.warning(f"[LOTTERY] Deferred settlement loop start: {e}")
 
 # === AIRDROP MODULE (Robust, Fixed, Ready-to-Use) ===
+import heapq
 import time
+from itertools import groupby
 import random
 import string
 import re
@@ -1730,11 +2016,20 @@ def _air_ts() -> int:
     return int(time.time())
 
 
+_AIR_FMT_UNITS = (("w", 604800), ("d", 86400), ("h", 3600), ("m", 60),
+                  ("s", 1))
+
+
 def _air_fmt_seconds(secs: int) -> str:
     secs = max(0, int(secs))
-    units = [("w", 604800), ("d", 86400), ("h", 3600), ("m", 60), ("s", 1)]
+    # Most deadlines shown are under an hour; skip the unit walk for those
+    if secs < 60:
+        return f"{secs}s"
+    if secs < 3600:
+        m, sec = divmod(secs, 60)
+        return f"{m}m {sec}s" if sec else f"{m}m"
     parts = []
-    for label, s in units:
+    for label, s in _AIR_FMT_UNITS:
         if secs >= s:
             v = secs // s
             secs -= v * s
@@ -1746,9 +2041,11 @@ def _air_human_time(ts: int) -> str:
     return f"<t:{int(ts)}:f> (in {_air_fmt_seconds(max(0, ts - _air_ts()))})"
 
 
+_AIR_ALPHABET = string.ascii_uppercase + string.digits
+
+
 def _air_unique_id() -> str:
-    alphabet = string.ascii_uppercase + string.digits
-    return "".join(random.choice(alphabet) for _ in range(AIR_ID_LEN))
+    return "".join(random.choices(_AIR_ALPHABET, k=AIR_ID_LEN))
 
 
 # ---------------- Parsing ----------------
@@ -1779,25 +2076,62 @@ _TIME_UNITS = {
     "months": 2592000,
 }
 
+# Same table bucketed by token length, so a lookup only compares against
+# the few synonyms that could possibly match
+_UNITS_BY_LEN: dict[int, dict[str, int]] = {}
+for _unit, _secs in _TIME_UNITS.items():
+    _UNITS_BY_LEN.setdefault(len(_unit), {})[_unit] = _secs
+del _unit, _secs
+_NO_UNITS: dict[str, int] = {}
+
+
+# Named apart from the lottery's _DUR_RE, which shares this module namespace
+_AIR_UNIT_RE = re.compile(r"[A-Za-z$]+")
+
 
 def _air_parse_duration(s: str) -> int:
+    # Single pass over "<number>[ ]<unit>" pairs, e.g. "1h 30m" or "2 mon";
+    # text between pairs is skipped, as the old findall pattern did
     s = (s or "").strip().lower()
-    parts = re.findall(r"(\d+(?:\.\d+)?)\s*([a-z]+)", s)
-    if not parts:
-        raise ValueError("Invalid duration.")
+    i, n = 0, len(s)
     total = 0
-    for num, unit in parts:
-        if unit not in _TIME_UNITS:
+    found = False
+    while i < n:
+        if not s[i].isdigit():
+            i += 1
+            continue
+        j = i
+        while j < n and s[j].isdigit():
+            j += 1
+        if j + 1 < n and s[j] == "." and s[j + 1].isdigit():
+            j += 1
+            while j < n and s[j].isdigit():
+                j += 1
+        k = j
+        while k < n and s[k].isspace():
+            k += 1
+        u = k
+        while u < n and "a" <= s[u] <= "z":
+            u += 1
+        if u == k:
+            i += 1
+            continue
+        unit = s[k:u]
+        mult = _UNITS_BY_LEN.get(u - k, _NO_UNITS).get(unit)
+        if mult is None:
             raise ValueError(f"Unknown time unit '{unit}'")
-        total += int(float(num) * _TIME_UNITS[unit])
+        total += int(float(s[i:j]) * mult)
+        found = True
+        i = u
+    if not found:
+        raise ValueError("Invalid duration.")
     if total <= 0:
         raise ValueError("Duration must be positive.")
     return total
 
 
 async def _usd_to_qc(usd_amount: float) -> float:
-    async with aiohttp.ClientSession() as session:
-        prices = await fetch_sol_price(session, ["usd"])
+    prices = await _cached_sol_prices(await _get_price_session())
     usd_per_sol = float(prices.get("usd") or 0.0)
     if usd_per_sol <= 0:
         raise RuntimeError("Live SOL price unavailable.")
@@ -1861,6 +2195,25 @@ def _airdrop_init_schema():
             joined_at INTEGER,
             UNIQUE(airdrop_id,user_id)
         )""")
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS idx_airdrop_open ON airdrop(status, ends_at)"
+        )
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS idx_airdrop_claims_aid ON airdrop_claims(airdrop_id)"
+        )
+
+
+_AIR_INSERT_SQL = """
+    INSERT INTO airdrop (unique_id,status,amount_qc,created_at,ends_at,created_by,channel_id,guild_id,scope,message_id)
+    VALUES (?,?,?,?,?,?,?,?,?,?)
+"""
+
+
+def _air_insert_params(now: int, unique_id, amount_qc, duration, created_by,
+                       channel_id, guild_id, scope="local") -> tuple:
+    return (unique_id, "open", float(amount_qc), now, now + int(duration),
+            int(created_by), int(channel_id) if channel_id else None,
+            int(guild_id) if guild_id else None, scope, None)
 
 
 def _airdrop_create(unique_id,
@@ -1870,23 +2223,40 @@ def _airdrop_create(unique_id,
                     channel_id,
                     guild_id,
                     scope="local"):
+    params = _air_insert_params(_air_ts(), unique_id, amount_qc, duration,
+                                created_by, channel_id, guild_id, scope)
+    with _transaction() as cur:
+        cur.execute(_AIR_INSERT_SQL, params)
+        pk = cur.lastrowid
+    _air_schedule(params[4], pk)
+    return pk
+
+
+def _airdrop_create_many(records: list[dict]) -> list[int]:
+    """
+    Bulk form of _airdrop_create for seeding/scripts: each record holds the
+    same keyword arguments. All rows go in with one executemany/commit.
+    """
+    if not records:
+        return []
     now = _air_ts()
-    ends = now + int(duration)
+    rows = [_air_insert_params(now, **r) for r in records]
     with _transaction() as cur:
-        cur.execute(
-            """
-            INSERT INTO airdrop (unique_id,status,amount_qc,created_at,ends_at,created_by,channel_id,guild_id,scope,message_id)
-            VALUES (?,?,?,?,?,?,?,?,?,?)
-        """, (unique_id, "open", float(amount_qc), now, ends, int(created_by),
-              int(channel_id) if channel_id else None,
-              int(guild_id) if guild_id else None, scope, None))
-        return cur.lastrowid
+        cur.executemany(_AIR_INSERT_SQL, rows)
+        # Rows from one executemany inside one write transaction get
+        # consecutive rowids ending at last_insert_rowid()
+        last = cur.execute("SELECT last_insert_rowid()").fetchone()[0]
+    pks = list(range(last - len(rows) + 1, last + 1))
+    for pk, row in zip(pks, rows):
+        _air_schedule(row[4], pk)
+    return pks
 
 
 def _airdrop_save_message_id(airdrop_pk: int, message_id: int):
     with _transaction() as cur:
         cur.execute("UPDATE airdrop SET message_id=? WHERE id=?",
                     (int(message_id), int(airdrop_pk)))
+    _air_meta_invalidate(airdrop_pk)
 
 
 def _airdrop_get_by_unique(uid: str):
@@ -1895,6 +2265,42 @@ def _airdrop_get_by_unique(uid: str):
     return dict(row) if row else None
 
 
+# unique_id -> (fetched_at, join meta). Open rows are only trusted briefly so
+# a join never races settlement for long; finished rows can live a bit longer.
+AIR_META_TTL_OPEN = 1.0
+AIR_META_TTL_DONE = 5.0
+AIR_META_MAX = 256
+_AIR_META_CACHE: dict[str, tuple[float, dict]] = {}
+
+
+def _air_meta_invalidate(airdrop_pk: int):
+    for key in [
+            k for k, (_, d) in _AIR_META_CACHE.items()
+            if d["id"] == int(airdrop_pk)
+    ]:
+        _AIR_META_CACHE.pop(key, None)
+
+
+def _airdrop_get_open_meta(uid: str):
+    """Just the columns the join paths check; verify/status use the full row."""
+    hit = _AIR_META_CACHE.get(uid)
+    if hit:
+        ttl = AIR_META_TTL_OPEN if hit[1]["status"] == "open" else AIR_META_TTL_DONE
+        if time.monotonic() - hit[0] < ttl:
+            return hit[1]
+    row = get_conn().execute(
+        "SELECT id, unique_id, status, scope, guild_id, ends_at FROM airdrop WHERE unique_id=?",
+        (uid, )).fetchone()
+    if not row:
+        _AIR_META_CACHE.pop(uid, None)
+        return None
+    if len(_AIR_META_CACHE) >= AIR_META_MAX:
+        _AIR_META_CACHE.clear()
+    d = dict(row)
+    _AIR_META_CACHE[uid] = (time.monotonic(), d)
+    return d
+
+
 def _airdrop_list_open():
     rows = get_conn().execute(
         "SELECT * FROM airdrop WHERE status='open' ORDER BY ends_at").fetchall(
@@ -1908,11 +2314,55 @@ def _airdrop_recent(limit: int = 5):
     return [dict(r) for r in rows] if rows else []
 
 
-def _airdrop_add_claim(airdrop_pk: int, user_id: int):
-    with _transaction() as cur:
-        cur.execute(
-            "INSERT OR IGNORE INTO airdrop_claims (airdrop_id,user_id,joined_at) VALUES (?,?,?)",
-            (int(airdrop_pk), int(user_id), _air_ts()))
+# Joins arriving within one window are written in a single transaction;
+# each caller awaits its own future so errors still reach the right user.
+AIR_CLAIM_WINDOW = 0.25  # seconds
+_air_pending_claims: list[tuple[int, int, asyncio.Future]] = []
+_air_claim_flush: asyncio.Task | None = None
+
+
+async def _air_flush_claims():
+    global _air_claim_flush
+    await asyncio.sleep(AIR_CLAIM_WINDOW)
+    batch = _air_pending_claims[:]
+    _air_pending_claims.clear()
+    _air_claim_flush = None
+    now = _air_ts()
+    pks = sorted({pk for pk, _, _ in batch})
+    try:
+        with _transaction() as cur:
+            # Claims that land after settlement committed are rejected; the
+            # write lock is held, so no airdrop can close between the two
+            open_pks = {
+                r[0]
+                for r in cur.execute(
+                    f"SELECT id FROM airdrop WHERE status='open' AND id IN "
+                    f"({','.join('?' * len(pks))})", pks).fetchall()
+            }
+            cur.executemany(
+                "INSERT OR IGNORE INTO airdrop_claims (airdrop_id,user_id,joined_at) VALUES (?,?,?)",
+                [(pk, uid, now) for pk, uid, _ in batch if pk in open_pks])
+    except Exception as e:
+        for _, _, fut in batch:
+            if not fut.done():
+                fut.set_exception(e)
+        return
+    for pk, _, fut in batch:
+        if fut.done():
+            continue
+        if pk in open_pks:
+            fut.set_result(None)
+        else:
+            fut.set_exception(RuntimeError("that airdrop has already ended."))
+
+
+async def _airdrop_add_claim_batched(airdrop_pk: int, user_id: int):
+    global _air_claim_flush
+    fut = asyncio.get_running_loop().create_future()
+    _air_pending_claims.append((int(airdrop_pk), int(user_id), fut))
+    if _air_claim_flush is None:
+        _air_claim_flush = asyncio.create_task(_air_flush_claims())
+    await fut
 
 
 def _airdrop_fetch_claimants(airdrop_pk: int):
@@ -1928,10 +2378,81 @@ def _airdrop_fetch_claimants(airdrop_pk: int):
     return out
 
 
+def _airdrop_fetch_expired_with_claims(now: int) -> list[tuple[dict, list[int]]]:
+    """Every open airdrop past its end time with its claimants, in one query."""
+    rows = get_conn().execute(
+        """
+        SELECT a.id, a.unique_id, a.amount_qc, a.created_at, a.ends_at,
+               a.created_by, a.channel_id, a.message_id, c.user_id AS claimant
+        FROM airdrop a
+        LEFT JOIN airdrop_claims c ON c.airdrop_id = a.id
+        WHERE a.status='open' AND a.ends_at <= ?
+        ORDER BY a.ends_at, a.id, c.id
+        """, (int(now), )).fetchall()
+    out = []
+    for _, group in groupby(rows, key=lambda r: r["id"]):
+        group = list(group)
+        d = {k: group[0][k] for k in group[0].keys() if k != "claimant"}
+        claimants = [
+            int(r["claimant"]) for r in group if r["claimant"] is not None
+        ]
+        out.append((d, claimants))
+    return out
+
+
 def _airdrop_set_status(airdrop_pk: int, status: str):
     with _transaction() as cur:
         cur.execute("UPDATE airdrop SET status=? WHERE id=?",
                     (str(status), int(airdrop_pk)))
+    _air_meta_invalidate(airdrop_pk)
+
+
+def _batch_credit(cur, rows: list[tuple[int, float, float]]):
+    """Apply (user_id, balance_delta, pnl_delta) rows with one prepared UPDATE."""
+    cur.executemany("INSERT OR IGNORE INTO users (user_id) VALUES (?)",
+                    [(uid, ) for uid, _, _ in rows])
+    cur.executemany(
+        "UPDATE users SET balance = balance + ?, net_profit_loss = net_profit_loss + ? "
+        "WHERE user_id=?", [(amt, pnl, uid) for uid, amt, pnl in rows])
+
+
+# SQL text per power-of-two id count; short lists are padded with -1 (never
+# a real rowid) so SQLite's statement cache sees only a handful of shapes.
+_UPDATE_SQL_CACHE: dict[int, str] = {}
+
+
+def _air_settled_sql(ids: list[int]) -> tuple[str, list[int]]:
+    n_bucket = 1 << (len(ids) - 1).bit_length()
+    sql = _UPDATE_SQL_CACHE.get(n_bucket)
+    if sql is None:
+        sql = _UPDATE_SQL_CACHE[n_bucket] = (
+            "UPDATE airdrop SET status='settled' WHERE id IN (" +
+            ",".join("?" * n_bucket) + ")")
+    return sql, ids + [-1] * (n_bucket - len(ids))
+
+
+def _airdrop_settle_batch(settled: list[tuple[dict, list[int]]]):
+    """
+    Pay out and mark settled every (airdrop, claimants) pair in one commit.
+    Claimants split the pot equally; the creator gets the rounding dust, or
+    the whole amount back when nobody joined.
+    """
+    rows = []
+    for d, claimants in settled:
+        total_qc = float(d["amount_qc"] or 0.0)
+        refund = total_qc
+        if claimants and total_qc > 0:
+            share = total_qc / len(claimants)
+            rows.extend((uid, share, share) for uid in claimants)
+            refund = max(0.0, total_qc - share * len(claimants))
+        if refund > 0:
+            rows.append((int(d["created_by"]), refund, 0.0))
+    with _transaction() as cur:
+        _batch_credit(cur, rows)
+        if settled:
+            cur.execute(*_air_settled_sql([int(d["id"]) for d, _ in settled]))
+    for d, _ in settled:
+        _AIR_META_CACHE.pop(d["unique_id"], None)
 
 
 # ---------------- Join View ----------------
@@ -1945,7 +2466,7 @@ class AirdropJoinView(discord.ui.View):
     async def join(self, interaction: discord.Interaction,
                    button: discord.ui.Button):
         uid = (self.unique_id or "").strip().upper()
-        d = _airdrop_get_by_unique(uid)
+        d = _airdrop_get_open_meta(uid)
         if not d:
             return await interaction.response.send_message(
                 "❌ This airdrop no longer exists.", ephemeral=True)
@@ -1960,7 +2481,7 @@ class AirdropJoinView(discord.ui.View):
                     "🚫 This airdrop is local to another server.",
                     ephemeral=True)
         try:
-            _airdrop_add_claim(d["id"], interaction.user.id)
+            await _airdrop_add_claim_batched(d["id"], interaction.user.id)
         except Exception as e:
             return await interaction.response.send_message(
                 f"❌ Failed to join: {e}", ephemeral=True)
@@ -2018,9 +2539,9 @@ async def _edit_to_result(d: dict, claimants: list[int]):
             pass
         return
     try:
-        original = await ch.fetch_message(int(msg_id))
-        # Critical: remove all buttons by passing view=None during edit[1][2]
-        await original.edit(embed=embed, view=None)
+        # PATCH via a partial message; no GET needed. view=None strips buttons
+        await ch.get_partial_message(int(msg_id)).edit(embed=embed,
+                                                        view=None)
     except Exception:
         # If fetch or edit fails, at least post the result
         try:
@@ -2042,8 +2563,6 @@ async def airdrop_cmd(ctx, amount: str, *rest):
     !airdrop 0.1 qc 10s
     Add 'public' at the end for cross-server scope.
     """
-    import re
-
     # 1) Collect tokens
     tokens = [t for t in rest if isinstance(t, str)]
 
@@ -2055,7 +2574,7 @@ async def airdrop_cmd(ctx, amount: str, *rest):
 
     # 3) Optional unit token immediately after amount (letters or $ only)
     unit = None
-    if tokens and re.fullmatch(r"[A-Za-z$]+", tokens[0]):
+    if tokens and _AIR_UNIT_RE.fullmatch(tokens[0]):
         unit = tokens[0]
         tokens = tokens[1:]
 
@@ -2133,7 +2652,7 @@ async def airdrop_cmd(ctx, amount: str, *rest):
 
 @bot.command(name="join_airdrop", aliases=["airdrop_join"])
 async def join_airdrop_cmd(ctx, unique_id: str):
-    d = _airdrop_get_by_unique((unique_id or "").strip().upper())
+    d = _airdrop_get_open_meta((unique_id or "").strip().upper())
     if not d:
         return await ctx.send("❌ No such airdrop.")
     if d["status"] != "open":
@@ -2142,7 +2661,7 @@ async def join_airdrop_cmd(ctx, unique_id: str):
         if not ctx.guild or (int(d.get("guild_id") or 0) != ctx.guild.id):
             return await ctx.send("🚫 This airdrop is local to another server.")
     try:
-        _airdrop_add_claim(d["id"], ctx.author.id)
+        await _airdrop_add_claim_batched(d["id"], ctx.author.id)
     except Exception as e:
         return await ctx.send(f"❌ Failed to join: {e}")
     tl = _air_fmt_seconds(max(0, int(d["ends_at"]) - _air_ts()))
@@ -2283,8 +2802,8 @@ async def airdrop_cancel_cmd(ctx, unique_id: str):
                 pass
             return
         try:
-            original = await ch.fetch_message(int(msg_id))
-            await original.edit(embed=embed, view=None)
+            await ch.get_partial_message(int(msg_id)).edit(embed=embed,
+                                                            view=None)
         except Exception:
             try:
                 await ch.send(embed=embed)
@@ -2296,38 +2815,48 @@ async def airdrop_cancel_cmd(ctx, unique_id: str):
 
 
 # ---------------- Settlement Loop ----------------
+# Min-heap of (ends_at, airdrop pk); the loop sleeps until the earliest one.
+# Canceled airdrops may linger here; their wake-up simply finds nothing.
+_AIR_HEAP: list[tuple[int, int]] = []
+_AIR_WAKE = asyncio.Event()
+
+
+def _air_schedule(ends_at: int, airdrop_pk: int):
+    heapq.heappush(_AIR_HEAP, (int(ends_at), int(airdrop_pk)))
+    _AIR_WAKE.set()
+
+
 async def _airdrop_loop():
     _airdrop_init_schema()
     await bot.wait_until_ready()
+    for d in _airdrop_list_open():
+        heapq.heappush(_AIR_HEAP, (int(d["ends_at"]), int(d["id"])))
     while not bot.is_closed():
         try:
+            _AIR_WAKE.clear()
+            if not _AIR_HEAP:
+                await _AIR_WAKE.wait()
+                continue
+            delay = _AIR_HEAP[0][0] - _air_ts()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(_AIR_WAKE.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
             now = _air_ts()
-            for d in _airdrop_list_open():
-                if now >= int(d["ends_at"]):
-                    total_qc = float(d["amount_qc"] or 0.0)
-                    claimants = _airdrop_fetch_claimants(d["id"])
-                    paid = 0.0
-                    if claimants and total_qc > 0:
-                        share = total_qc / len(claimants)
-                        for uid in claimants:
-                            try:
-                                update_balance(uid, share)
-                                update_stats(uid, net_profit_loss=share)
-                                paid += share
-                            except Exception:
-                                # Continue paying others even if one credit fails
-                                pass
-                        dust = max(0.0, total_qc - paid)
-                        if dust > 0:
-                            update_balance(int(d["created_by"]), dust)
-
-                    else:
-                        if total_qc > 0:
-                            update_balance(int(d["created_by"]), total_qc)
-
-                    _airdrop_set_status(d["id"], "settled")
-                    await _edit_to_result(d, claimants)
-            await asyncio.sleep(3)
+            settled = _airdrop_fetch_expired_with_claims(now)
+            if settled:
+                # All payouts for this tick commit together; message edits
+                # happen afterwards, outside the transaction
+                _airdrop_settle_batch(settled)
+            while _AIR_HEAP and _AIR_HEAP[0][0] <= now:
+                heapq.heappop(_AIR_HEAP)
+            if settled:
+                # Overlap the REST round-trips of every result edit
+                await asyncio.gather(*(_edit_to_result(d, claimants)
+                                       for d, claimants in settled),
+                                     return_exceptions=True)
         except Exception:
             # Avoid tight failure loops
             await asyncio.sleep(5)
@@ -2358,6 +2887,14 @@ else:
 
 
 # ─GAMESSSS
+# Board cell value -> (button label, button style)
+_TTT_CELL = {
+    " ": ("⬛", discord.ButtonStyle.secondary),
+    "X": ("X", discord.ButtonStyle.success),
+    "O": ("O", discord.ButtonStyle.danger),
+}
+
+
 class TicTacToeView(discord.ui.View):
 
     def __init__(self, game, wager, ctx, opponent):
@@ -2366,64 +2903,58 @@ class TicTacToeView(discord.ui.View):
         self.wager = wager
         self.ctx = ctx
         self.opponent = opponent
+        # Nine buttons built once; moves only relabel them in place
+        self._cells = []
+        for i in range(9):
+            button = discord.ui.Button(row=i // 3, custom_id=str(i))
+            button.callback = self.on_cell
+            self.add_item(button)
+            self._cells.append(button)
         self.update_buttons()
 
     def update_buttons(self):
-        self.clear_items()
-        for i in range(9):
-            label = self.game.board[i] if self.game.board[i] != " " else "⬛"
-            style = (discord.ButtonStyle.secondary
-                     if label == "⬛" else discord.ButtonStyle.success
-                     if label == "X" else discord.ButtonStyle.danger)
-            button = discord.ui.Button(label=label,
-                                       style=style,
-                                       row=i // 3,
-                                       custom_id=str(i))
-            button.callback = self.make_callback(i)
-            self.add_item(button)
+        for button, cell in zip(self._cells, self.game.board):
+            button.label, button.style = _TTT_CELL[cell]
 
-    def make_callback(self, pos):
-
-        async def callback(interaction: discord.Interaction):
-            if interaction.user.id != self.game.turn:
-                await interaction.response.send_message("❌ Not your turn!",
-                                                        ephemeral=True)
-                return
-
-            valid, result = self.game.make_move(interaction.user.id, pos)
-            if not valid:
-                await interaction.response.send_message(f"❌ {result}",
-                                                        ephemeral=True)
-                return
-
-            self.update_buttons()
-            content = f"{self.ctx.author.mention} (X) vs {self.opponent.mention} (O)"
-
-            if self.game.game_over:
-                # Disable all buttons after game ends
-                for child in self.children:
-                    child.disabled = True
-
-                if self.game.winner is None:
-                    # Draw → refund wagers
-                    if self.wager > 0:
-                        update_balance(self.game.player1_id, self.wager)
-                        update_balance(self.game.player2_id, self.wager)
-                    content += "\n🤝 It's a draw!"
-                else:
-                    # Someone won
-                    winner_id = self.game.winner
-                    winner_mention = interaction.guild.get_member(
-                        winner_id).mention
-                    if self.wager > 0:
-                        update_balance(winner_id, self.wager * 2)
-                        content += f"\n💰 {winner_mention} won {self.wager:.3f} QuantaCoin and has been credited!"
-                    else:
-                        content += f"\n🏆 {winner_mention} wins!"
+    async def on_cell(self, interaction: discord.Interaction):
+        pos = int(interaction.data["custom_id"])
+        if interaction.user.id != self.game.turn:
+            await interaction.response.send_message("❌ Not your turn!",
+                                                    ephemeral=True)
+            return
+
+        valid, result = self.game.make_move(interaction.user.id, pos)
+        if not valid:
+            await interaction.response.send_message(f"❌ {result}",
+                                                    ephemeral=True)
+            return
 
-            await interaction.response.edit_message(content=content, view=self)
+        self.update_buttons()
+        content = f"{self.ctx.author.mention} (X) vs {self.opponent.mention} (O)"
+
+        if self.game.game_over:
+            # Disable all buttons after game ends
+            for child in self.children:
+                child.disabled = True
+
+            if self.game.winner is None:
+                # Draw → refund wagers
+                if self.wager > 0:
+                    update_balance(self.game.player1_id, self.wager)
+                    update_balance(self.game.player2_id, self.wager)
+                content += "\n🤝 It's a draw!"
+            else:
+                # Someone won
+                winner_id = self.game.winner
+                winner_mention = interaction.guild.get_member(
+                    winner_id).mention
+                if self.wager > 0:
+                    update_balance(winner_id, self.wager * 2)
+                    content += f"\n💰 {winner_mention} won {self.wager:.3f} QuantaCoin and has been credited!"
+                else:
+                    content += f"\n🏆 {winner_mention} wins!"
 
-        return callback
+        await interaction.response.edit_message(content=content, view=self)
 
 
 @bot.command(name="tictactoe", aliases=["ttt"])
@@ -2480,7 +3011,9 @@ import hashlib
 import secrets
 import time
 import re
+import struct
 import asyncio
+from dataclasses import dataclass
 import discord
 from discord.ext import commands
 
@@ -2495,6 +3028,8 @@ KENO_MIN_WAGER = 0.005
 KENO_MAX_WAGER = 100_000
 KENO_TIMEOUT = 60
 KENO_HOUSE_EDGE = 0.01  # 1% house edge (applied on wins)
+_KENO_POOL_SIZE = KENO_POOL_MAX - KENO_POOL_MIN + 1
+_NET_KENO = 1.0 - KENO_HOUSE_EDGE
 
 # Multipliers for exactly 6 picks (base multipliers; house edge applied afterwards)
 KENO_PAYOUTS_6 = {
@@ -2506,75 +3041,158 @@ KENO_PAYOUTS_6 = {
     5: 100,
     6: 800,
 }
+# Indexed by match count (0..KENO_ALLOWED_PICKS)
+_KENO_PAYOUT_TABLE = tuple(
+    float(KENO_PAYOUTS_6.get(i, 0)) for i in range(KENO_ALLOWED_PICKS + 1))
 
 # ===== Provably Fair (PF) state for Keno =====
-_keno_pf_state: dict[int, dict] = {
-}  # user_id -> {server_seed, server_hash, client_seed, nonce}
+@dataclass(slots=True)
+class PFState:
+    server_seed: str
+    server_seed_b: bytes
+    server_hash: str
+    client_seed: str
+    nonce: int = 0
+
 
+_keno_pf_state: dict[int, PFState] = {}  # user_id -> PFState
 
-def keno_pf_new_commitment(user_id: int) -> dict:
+
+def keno_pf_new_commitment(user_id: int) -> PFState:
     """
     Create a fresh PF commitment (server_seed, server_hash, client_seed, nonce=0) for this user.
     """
     server_seed = secrets.token_hex(32)
-    server_hash = hashlib.sha256(server_seed.encode()).hexdigest()
+    server_seed_b = server_seed.encode()
+    server_hash = hashlib.sha256(server_seed_b).hexdigest()
     client_seed = f"{user_id}-{int(time.time())}-{secrets.token_hex(4)}"
-    _keno_pf_state[user_id] = {
-        "server_seed": server_seed,
-        "server_hash": server_hash,
-        "client_seed": client_seed,
-        "nonce": 0
-    }
+    _keno_pf_state[user_id] = PFState(server_seed, server_seed_b,
+                                      server_hash, client_seed)
     return _keno_pf_state[user_id]
 
 
-def keno_pf_get_or_create(user_id: int) -> dict:
+def keno_pf_get_or_create(user_id: int) -> PFState:
     return _keno_pf_state.get(user_id) or keno_pf_new_commitment(user_id)
 
 
 def keno_pf_set_client_seed(user_id: int, client_seed: str):
     st = keno_pf_get_or_create(user_id)
-    st["client_seed"] = client_seed
-    st["nonce"] = 0  # reset nonce when changing client seed
+    st.client_seed = client_seed
+    st.nonce = 0  # reset nonce when changing client seed
+
+
+# PRF for new keno rounds; "hmac-sha256" replays the original chunked draw
+# so rounds played before the shuffle still verify
+_PF_ALGO = "blake2b"
+_KENO_PF_ALGOS = ("blake2b", "hmac-sha256")
+
+
+def _keno_pf_hmac_digest(server_seed: bytes, message: str) -> bytes:
+    return hmac.digest(server_seed, message.encode(), "sha256")
+
+
+def _keno_prf(key: bytes, msg: bytes) -> bytes:
+    return hashlib.blake2b(msg, key=key, digest_size=32).digest()
+
+
+def _keno_pf_digest(server_seed: bytes, message: str) -> bytes:
+    return _keno_prf(server_seed, message.encode())
+
+
+_KENO_POOL = tuple(range(KENO_POOL_MIN, KENO_POOL_MAX + 1))
+_KENO_WORDS = struct.Struct(f"<{KENO_DRAWS}H")
+_KENO_LEGACY_WORDS = struct.Struct(">8I")
+
+
+def _keno_mask_nums(mask: int) -> list[int]:
+    """Numbers whose bits are set, ascending."""
+    return [n for n in _KENO_POOL if mask >> n & 1]
+
+
+def _keno_draw_from_digest(digest: bytes, count: int = KENO_DRAWS) -> int:
+    """
+    Partial Fisher–Yates over the pool, driven by 2-byte little-endian words
+    of a single digest (KENO_DRAWS words always fit in 32 bytes).
+    Returns the first `count` numbers as a bitmask (bit n set when n is drawn).
+    """
+    pool = list(_KENO_POOL)
+    mask = 0
+    for i, word in enumerate(_KENO_WORDS.unpack_from(digest)[:count]):
+        j = i + word % (_KENO_POOL_SIZE - i)
+        pool[i], pool[j] = pool[j], pool[i]
+        mask |= 1 << pool[i]
+    return mask
+
+
+def _keno_draw_legacy(server_seed: bytes, client_seed: str,
+                      nonce: int) -> int:
+    """
+    The original keno draw: 4-byte big-endian words of
+    HMAC-SHA256(server_seed, f"{client_seed}:{nonce}:{chunk}") for
+    chunk = 0, 1, ..., each mapped to (word % pool) + KENO_POOL_MIN, repeats
+    skipped, until KENO_DRAWS numbers are drawn. Returns a bitmask.
+    """
+    mask = 0
+    drawn = 0
+    chunk = 0
+    while drawn < KENO_DRAWS:
+        digest = _keno_pf_hmac_digest(server_seed,
+                                      f"{client_seed}:{nonce}:{chunk}")
+        for word in _KENO_LEGACY_WORDS.unpack(digest):
+            bit = 1 << (word % _KENO_POOL_SIZE + KENO_POOL_MIN)
+            if not mask & bit:
+                mask |= bit
+                drawn += 1
+                if drawn >= KENO_DRAWS:
+                    break
+        chunk += 1
+    return mask
 
 
-def _keno_pf_hmac_hex(server_seed: str, message: str) -> str:
-    return hmac.new(server_seed.encode(),
-                    msg=message.encode(),
-                    digestmod=hashlib.sha256).hexdigest()
+def _recompute_keno_draw(server_seed: str,
+                         client_seed: str,
+                         nonce: int,
+                         algo: str = _PF_ALGO) -> tuple[int, int]:
+    """
+    Returns (draw_mask, auto_picks_mask) for the given seeds and nonce.
+    Legacy rounds drew auto picks with `random`, so their auto mask is 0.
+    """
+    key = server_seed.encode()
+    if algo == "hmac-sha256":
+        return _keno_draw_legacy(key, client_seed, nonce), 0
+    draw_mask = _keno_draw_from_digest(
+        _keno_pf_digest(key, f"{client_seed}:{nonce}"))
+    auto_mask = _keno_draw_from_digest(
+        _keno_pf_digest(key, f"{client_seed}:{nonce}:auto"),
+        KENO_ALLOWED_PICKS)
+    return draw_mask, auto_mask
+
+
+def _auto_picks(user_id: int) -> list[int]:
+    """
+    PF auto picks for the upcoming round, shuffled from
+    PRF(server_seed, f"{client_seed}:{nonce}:auto") so `!keno_verify` can
+    reproduce them alongside the draw.
+    """
+    st = keno_pf_get_or_create(user_id)
+    digest = _keno_pf_digest(st.server_seed_b,
+                             f"{st.client_seed}:{st.nonce}:auto")
+    return _keno_mask_nums(_keno_draw_from_digest(digest, KENO_ALLOWED_PICKS))
 
 
-def keno_generate_draw(user_id: int) -> tuple[set[int], int]:
+def keno_generate_draw(user_id: int) -> tuple[int, int]:
     """
     Deterministic draw of KENO_DRAWS unique numbers within KENO_POOL_MIN..KENO_POOL_MAX
-    using HMAC(server_seed, f"{client_seed}:{nonce}:{chunk_index}") to produce a byte stream.
-    Returns (draw_set, nonce_used). Increments nonce after use.
+    shuffled from PRF(server_seed, f"{client_seed}:{nonce}"), PRF = _PF_ALGO.
+    Returns (draw_mask, nonce_used). Increments nonce after use.
     """
     st = keno_pf_get_or_create(user_id)
-    server_seed = st["server_seed"]
-    client_seed = st["client_seed"]
-    nonce = st["nonce"]
-
-    draw = set()
-    chunk_index = 0
-    while len(draw) < KENO_DRAWS:
-        digest_hex = _keno_pf_hmac_hex(server_seed,
-                                       f"{client_seed}:{nonce}:{chunk_index}")
-        # Consume digest in 4-hex-byte chunks (2 bytes) to map into pool range
-        for i in range(0, len(digest_hex), 8):
-            part = digest_hex[i:i + 8]
-            if len(part) < 8:
-                continue
-            val = int(part, 16)
-            rng_num = (val %
-                       (KENO_POOL_MAX - KENO_POOL_MIN + 1)) + KENO_POOL_MIN
-            draw.add(rng_num)
-            if len(draw) >= KENO_DRAWS:
-                break
-        chunk_index += 1
+    nonce = st.nonce
+    digest = _keno_pf_digest(st.server_seed_b, f"{st.client_seed}:{nonce}")
+    draw_mask = _keno_draw_from_digest(digest)
 
-    st["nonce"] += 1
-    return draw, nonce
+    st.nonce += 1
+    return draw_mask, nonce
 
 
 # === Utility funcs ===
@@ -2582,9 +3200,10 @@ def _format_number_list(nums):
     return ", ".join(str(n) for n in sorted(nums)) if nums else "—"
 
 
-def _render_draw_with_highlight(draw_set, picks_set):
-    return " ".join(
-        (f"✅{n}" if n in picks_set else f"🔲{n}") for n in sorted(draw_set))
+def _render_draw_with_highlight(draw_mask: int, picks_mask: int) -> str:
+    parts = [("✅" if picks_mask >> n & 1 else "🔲") + str(n)
+             for n in _KENO_POOL if draw_mask >> n & 1]
+    return " ".join(parts)
 
 
 def _parse_amount_str(s: str, user_balance: float) -> float:
@@ -2594,34 +3213,78 @@ def _parse_amount_str(s: str, user_balance: float) -> float:
     return float(s)
 
 
+_PICKS_SPLIT_RE = re.compile(r"[,\s]+")
+
+
 def _parse_picks_str(s: str):
-    s = s.strip().rstrip(")")
-    raw = re.split(r"[, \s]+", s)
-    nums = []
-    for token in raw:
-        if token:
-            nums.append(int(token))
-    return nums
+    return [int(t) for t in _PICKS_SPLIT_RE.split(s.strip().rstrip(")")) if t]
 
 
 def _validate_picks(nums):
+    """Returns (ok, error, picks_mask); matches are (draw & picks).bit_count()."""
     if len(nums) != KENO_ALLOWED_PICKS:
-        return False, f"❌ Exactly {KENO_ALLOWED_PICKS} numbers are required."
-    if len(set(nums)) != len(nums):
-        return False, "❌ Invalid numbers (numbers repeated)."
+        return False, f"❌ Exactly {KENO_ALLOWED_PICKS} numbers are required.", 0
+    mask = 0
     for n in nums:
         if not (KENO_POOL_MIN <= n <= KENO_POOL_MAX):
-            return False, f"❌ Numbers must be between {KENO_POOL_MIN}-{KENO_POOL_MAX}."
-    return True, ""
+            return False, f"❌ Numbers must be between {KENO_POOL_MIN}-{KENO_POOL_MAX}.", 0
+        bit = 1 << n
+        if mask & bit:
+            return False, "❌ Invalid numbers (numbers repeated).", 0
+        mask |= bit
+    return True, "", mask
 
 
 def _calc_multiplier(matches: int) -> float:
-    return float(KENO_PAYOUTS_6.get(matches, 0))
+    return _KENO_PAYOUT_TABLE[matches]
+
+
+# Short-lived balance reads for the pre-bet guard; settle_round rechecks
+# funds inside its transaction, so a stale hit can never overdraw.
+BALANCE_CACHE_TTL = 0.25  # seconds
+_balance_cache: dict[int, tuple[float, float]] = {}  # uid -> (balance, expiry)
 
 
-def get_bot_qc_balance() -> float:
-    BOT_USER_ID = bot.user.id
-    return fetch_user(BOT_USER_ID)["balance"]
+def _cached_balance(uid: int) -> float:
+    v = _balance_cache.get(uid)
+    if v and v[1] > time.monotonic():
+        return v[0]
+    b = fetch_user(uid)["balance"]
+    _balance_cache[uid] = (b, time.monotonic() + BALANCE_CACHE_TTL)
+    return b
+
+
+def settle_round(user_id: int, bot_id: int, wager: float,
+                 payout: float) -> str:
+    """
+    Take the wager and pay the prize in one commit: the user moves by
+    payout - wager and the bot by the opposite. Nothing is written unless
+    both sides can cover it. Returns "ok", "user_funds" or "bot_funds".
+    """
+    net = payout - wager
+    with _transaction() as cur:
+        cur.executemany("INSERT OR IGNORE INTO users (user_id) VALUES (?)",
+                        [(user_id, ), (bot_id, )])
+        bal = dict(
+            cur.execute(
+                "SELECT user_id, balance FROM users WHERE user_id IN (?,?)",
+                (user_id, bot_id)).fetchall())
+        if bal[user_id] < wager:
+            return "user_funds"
+        if bal[bot_id] + wager < payout:
+            return "bot_funds"
+        cur.execute(
+            "UPDATE users SET balance = balance + ?, total_wagered = total_wagered + ?, "
+            "net_profit_loss = net_profit_loss + ? WHERE user_id=?",
+            (net, wager, net, user_id))
+        if net:  # a push only moves the user's wager stats
+            cur.execute(
+                "UPDATE users SET balance = balance - ? WHERE user_id=?",
+                (net, bot_id))
+    _balance_cache.pop(user_id, None)
+    if net:
+        _balance_cache.pop(bot_id, None)
+    return "ok"
 
 
 # === Commands ===
@@ -2645,7 +3308,7 @@ async def keno_seed_cmd(ctx, *, client_seed: str):
     keno_pf_set_client_seed(ctx.author.id, client_seed.strip())
     st = keno_pf_get_or_create(ctx.author.id)
     await ctx.send(f"✅ Keno client seed set.\n"
-                   f"PF Server Hash: `{st['server_hash']}`\n"
+                   f"PF Server Hash: `{st.server_hash}`\n"
                    f"Nonce reset to 0.")
 
 
@@ -2655,7 +3318,7 @@ async def keno_cmd(ctx):
     Conversational Keno (Provably Fair, 1% house edge):
     1) Ask QC amount
     2) Ask for exactly 6 unique numbers between 1–40 (type 'auto' to let the bot pick)
-    3) PF draw using HMAC(server_seed, f"{client_seed}:{nonce}:{chunk}")
+    3) PF draw: Fisher–Yates driven by PRF(server_seed, f"{client_seed}:{nonce}")
     4) Payout from bot balance; refund if bot can't cover
     5) Reveal seeds for verification
     """
@@ -2670,9 +3333,8 @@ async def keno_cmd(ctx):
         return m.author.id == user_id and m.channel.id == ctx.channel.id
 
     try:
-        amt_msg = await bot.wait_for("message",
-                                     check=amt_check,
-                                     timeout=KENO_TIMEOUT)
+        async with asyncio.timeout(KENO_TIMEOUT):
+            amt_msg = await bot.wait_for("message", check=amt_check)
     except asyncio.TimeoutError:
         return await ctx.send("⏰ Timed out waiting for amount.")
 
@@ -2689,11 +3351,6 @@ async def keno_cmd(ctx):
         return await ctx.send(
             f"❌ Insufficient QC. Balance: {u['balance']:.3f} QC.")
 
-    # Deduct now (wager goes to bot)
-    update_balance(user_id, -wager)
-    update_balance(bot.user.id, wager)
-    update_stats(user_id, total_wagered=wager)
-
     # STEP 2 — Ask picks (supports 'auto')
     await ctx.send(
         f"Pick {KENO_ALLOWED_PICKS} numbers between {KENO_POOL_MIN} and {KENO_POOL_MAX} (comma-separated), or type `auto`."
@@ -2704,23 +3361,17 @@ async def keno_cmd(ctx):
 
     while True:
         try:
-            picks_msg = await bot.wait_for("message",
-                                           check=picks_check,
-                                           timeout=KENO_TIMEOUT)
+            async with asyncio.timeout(KENO_TIMEOUT):
+                picks_msg = await bot.wait_for("message", check=picks_check)
         except asyncio.TimeoutError:
-            # Refund wager if user doesn't finish
-            update_balance(user_id, wager)
-            update_balance(bot.user.id, -wager)
+            # Wager is only taken at settlement, so nothing to refund
             return await ctx.send(
-                "⏰ Timed out waiting for numbers. Wager refunded.")
+                "⏰ Timed out waiting for numbers. No QC was taken.")
 
         content = picks_msg.content.strip().lower()
         if content == "auto":
-            # Bot generates a valid random set of picks
-            import random as _r
-            auto_nums = sorted(
-                _r.sample(range(KENO_POOL_MIN, KENO_POOL_MAX + 1),
-                          KENO_ALLOWED_PICKS))
+            # Bot derives the picks from the PF seeds for this round's nonce
+            auto_nums = _auto_picks(user_id)
             await ctx.send(
                 f"🤖 Auto picks selected: `{_format_number_list(auto_nums)}`")
             nums = auto_nums
@@ -2733,45 +3384,39 @@ async def keno_cmd(ctx):
                 )
                 continue
 
-        ok, err = _validate_picks(nums)
+        ok, err, picks_mask = _validate_picks(nums)
         if not ok:
             await ctx.send(err)
             await ctx.send("↩️ Choose again or type `auto`:")
             continue
 
-        picks = set(nums)
+        picks = frozenset(nums)
         break
 
     # STEP 3 — PF Draw
-    draw, nonce_used = keno_generate_draw(user_id)
-    matches = len(draw & picks)
+    draw_mask, nonce_used = keno_generate_draw(user_id)
+    matches = (draw_mask & picks_mask).bit_count()
     mult = _calc_multiplier(matches)
     # Apply 1% house edge on wins
-    payout = wager * mult * (1.0 - KENO_HOUSE_EDGE)
+    payout = wager * mult * _NET_KENO
 
-    # STEP 4 — Payout logic
-    prize_paid = False
-    if payout > 0:
-        bot_balance = get_bot_qc_balance()
-        if payout > bot_balance:
-            await ctx.send(
-                "❌ Not enough bot balance to payout, please contact admin.")
-            # Refund wager (cancel round)
-            update_balance(user_id, wager)
-            update_balance(bot.user.id, -wager)
-            return
-        else:
-            update_balance(user_id, payout)
-            update_balance(bot.user.id, -payout)
-            update_stats(user_id, net_profit_loss=(payout - wager))
-            prize_paid = True
-    else:
-        update_stats(user_id, net_profit_loss=(-wager))
+    # STEP 4 — Take wager and pay out in one commit
+    status = settle_round(user_id, bot.user.id, wager, payout)
+    if status == "user_funds":
+        return await ctx.send("❌ Insufficient QC to cover the wager.")
+    if status == "bot_funds":
+        return await ctx.send(
+            "❌ Not enough bot balance to payout, please contact admin.")
+    prize_paid = payout > 0
 
-    _last_keno_play[user_id] = {"wager": wager, "picks": picks}
+    _last_keno_play[user_id] = {
+        "wager": wager,
+        "picks": picks,
+        "picks_mask": picks_mask
+    }
 
     # STEP 5 — Results (embed + PF reveal)
-    draw_display = _render_draw_with_highlight(draw, picks)
+    draw_display = _render_draw_with_highlight(draw_mask, picks_mask)
     embed = discord.Embed(
         title="🎰 Keno Result (Provably Fair, 1% HE)",
         color=discord.Color.green() if prize_paid else discord.Color.red(),
@@ -2785,16 +3430,17 @@ async def keno_cmd(ctx):
     embed.add_field(
         name="🔒 PF Commitment (before roll)",
         value=
-        f"server_hash: `{st['server_hash']}`\nclient_seed: `{st['client_seed']}`\nnonce_used: `{nonce_used}`",
+        f"server_hash: `{st.server_hash}`\nclient_seed: `{st.client_seed}`\nnonce_used: `{nonce_used}`",
         inline=False)
     embed.add_field(
         name="🔓 PF Reveal (after roll)",
         value=
-        f"server_seed: `{st['server_seed']}`\nUse `!keno_verify` to check.",
+        f"server_seed: `{st.server_seed}`\nalgo: `{_PF_ALGO}`\nUse `!keno_verify` to check.",
         inline=False)
     embed.set_footer(
         text=
-        "Fairness: draw = HMAC(server_seed, f'{client_seed}:{nonce}:{chunk}')")
+        f"Fairness: draw = shuffle({_PF_ALGO}(server_seed, f'{{client_seed}}:{{nonce}}'))"
+    )
     await ctx.send(embed=embed)
 
 
@@ -2812,44 +3458,30 @@ async def keno_reroll_cmd(ctx):
 
     wager = _last_keno_play[user_id]["wager"]
     picks = _last_keno_play[user_id]["picks"]
+    picks_mask = _last_keno_play[user_id]["picks_mask"]
 
     if u["balance"] < wager:
         return await ctx.send(
             f"❌ Insufficient QC. Balance: {u['balance']:.3f} QC.")
 
-    # Deduct again (new round)
-    update_balance(user_id, -wager)
-    update_balance(bot.user.id, wager)
-    update_stats(user_id, total_wagered=wager)
-
     # PF state exists
     st = keno_pf_get_or_create(user_id)
 
     # Fresh PF draw
-    draw, nonce_used = keno_generate_draw(user_id)
-    matches = len(draw & picks)
+    draw_mask, nonce_used = keno_generate_draw(user_id)
+    matches = (draw_mask & picks_mask).bit_count()
     mult = _calc_multiplier(matches)
-    payout = wager * mult * (1.0 - KENO_HOUSE_EDGE)
+    payout = wager * mult * _NET_KENO
 
-    prize_paid = False
-    if payout > 0:
-        bot_balance = get_bot_qc_balance()
-        if payout > bot_balance:
-            await ctx.send(
-                "❌ Not enough bot balance to payout, please contact admin.")
-            # Refund
-            update_balance(user_id, wager)
-            update_balance(bot.user.id, -wager)
-            return
-        else:
-            update_balance(user_id, payout)
-            update_balance(bot.user.id, -payout)
-            update_stats(user_id, net_profit_loss=(payout - wager))
-            prize_paid = True
-    else:
-        update_stats(user_id, net_profit_loss=(-wager))
+    status = settle_round(user_id, bot.user.id, wager, payout)
+    if status == "user_funds":
+        return await ctx.send("❌ Insufficient QC to cover the wager.")
+    if status == "bot_funds":
+        return await ctx.send(
+            "❌ Not enough bot balance to payout, please contact admin.")
+    prize_paid = payout > 0
 
-    draw_display = _render_draw_with_highlight(draw, picks)
+    draw_display = _render_draw_with_highlight(draw_mask, picks_mask)
     embed = discord.Embed(
         title="🎰 Keno Reroll (Provably Fair, 1% HE)",
         color=discord.Color.green() if prize_paid else discord.Color.red(),
@@ -2863,16 +3495,17 @@ async def keno_reroll_cmd(ctx):
     embed.add_field(
         name="🔒 PF Commitment (before roll)",
         value=
-        f"server_hash: `{st['server_hash']}`\nclient_seed: `{st['client_seed']}`\nnonce_used: `{nonce_used}`",
+        f"server_hash: `{st.server_hash}`\nclient_seed: `{st.client_seed}`\nnonce_used: `{nonce_used}`",
         inline=False)
     embed.add_field(
         name="🔓 PF Reveal (after roll)",
         value=
-        f"server_seed: `{st['server_seed']}`\nUse `!keno_verify` to check.",
+        f"server_seed: `{st.server_seed}`\nalgo: `{_PF_ALGO}`\nUse `!keno_verify` to check.",
         inline=False)
     embed.set_footer(
         text=
-        "Fairness: draw = HMAC(server_seed, f'{client_seed}:{nonce}:{chunk}')")
+        f"Fairness: draw = shuffle({_PF_ALGO}(server_seed, f'{{client_seed}}:{{nonce}}'))"
+    )
     await ctx.send(embed=embed)
 
 
@@ -2880,16 +3513,22 @@ async def keno_reroll_cmd(ctx):
 async def keno_verify_cmd(ctx,
                           server_seed: str = None,
                           client_seed: str = None,
-                          nonce: int = None):
+                          nonce: int = None,
+                          algo: str = _PF_ALGO):
     """
     Verify Keno fairness:
     Usage:
       - Without args, uses your last PF state (current nonce-1).
-      - Or provide: !keno_verify <server_seed> <client_seed> <nonce>
+      - Or provide: !keno_verify <server_seed> <client_seed> <nonce> [algo]
+        (algo from the reveal: blake2b, or hmac-sha256 for older rounds)
     Recomputes the deterministic draw for comparison.
     """
     user_id = ctx.author.id
     st = _keno_pf_state.get(user_id)
+    algo = (algo or _PF_ALGO).strip().lower()
+    if algo not in _KENO_PF_ALGOS:
+        return await ctx.send(
+            f"❌ Unknown algo. Use one of: {', '.join(_KENO_PF_ALGOS)}.")
 
     if server_seed is not None and client_seed is not None and nonce is not None:
         use_server_seed = server_seed.strip()
@@ -2903,27 +3542,18 @@ async def keno_verify_cmd(ctx,
             return await ctx.send(
                 "❌ No PF state found. Run `!keno` first or provide seeds and nonce."
             )
-        use_server_seed = st["server_seed"]
-        use_client_seed = st["client_seed"]
-        use_nonce = max(0, st["nonce"] - 1)
+        use_server_seed = st.server_seed
+        use_client_seed = st.client_seed
+        use_nonce = max(0, st.nonce - 1)
 
     # Recompute draw deterministically
-    draw = set()
-    chunk_index = 0
-    while len(draw) < KENO_DRAWS:
-        digest_hex = _keno_pf_hmac_hex(
-            use_server_seed, f"{use_client_seed}:{use_nonce}:{chunk_index}")
-        for i in range(0, len(digest_hex), 8):
-            part = digest_hex[i:i + 8]
-            if len(part) < 8:
-                continue
-            val = int(part, 16)
-            rng_num = (val %
-                       (KENO_POOL_MAX - KENO_POOL_MIN + 1)) + KENO_POOL_MIN
-            draw.add(rng_num)
-            if len(draw) >= KENO_DRAWS:
-                break
-        chunk_index += 1
+    try:
+        draw_mask, auto_mask = await asyncio.to_thread(
+            _recompute_keno_draw, use_server_seed, use_client_seed, use_nonce,
+            algo)
+    except ValueError as e:
+        # blake2b keys are capped at 64 bytes
+        return await ctx.send(f"❌ Verification failed: {e}")
 
     embed = discord.Embed(
         title="🔎 Keno Fairness Verification",
@@ -2939,13 +3569,18 @@ async def keno_verify_cmd(ctx,
                     value=f"`{use_client_seed}`",
                     inline=False)
     embed.add_field(name="nonce", value=f"`{use_nonce}`", inline=False)
+    embed.add_field(name="algo", value=f"`{algo}`", inline=False)
     embed.add_field(name=f"Drawn ({KENO_DRAWS})",
-                    value=" ".join(str(n) for n in sorted(draw)),
+                    value=" ".join(map(str, _keno_mask_nums(draw_mask))),
                     inline=False)
-    embed.set_footer(
-        text=
-        "Fairness rule: draw = HMAC(server_seed, f'{client_seed}:{nonce}:{chunk}')"
-    )
+    embed.add_field(name="Auto picks (if `auto` was used)",
+                    value=_format_number_list(_keno_mask_nums(auto_mask)),
+                    inline=False)
+    if algo == "hmac-sha256":
+        rule = "draw = HMAC(server_seed, f'{client_seed}:{nonce}:{chunk}')"
+    else:
+        rule = f"draw = shuffle({algo}(server_seed, f'{{client_seed}}:{{nonce}}'))"
+    embed.set_footer(text=f"Fairness rule: {rule}")
     await ctx.send(embed=embed)
 
 
@@ -2959,70 +3594,76 @@ from typing import Optional
 
 # ---- Config ----
 LIMBO_HOUSE_EDGE = 0.01
+_NET_LIMBO = 1.0 - LIMBO_HOUSE_EDGE
 LIMBO_VIEW_TIMEOUT = 120
 LIMBO_IDLE_GIF = "https://media4.giphy.com/media/v1.Y2lkPTc5MGI3NjExZTZlODVqNmlpZnVvOHR6b2J4cGlpNHl5ZmlyY3A3dXdtNzJiZWt5cCZlcD12MV9pbnRlcm5hbF9naWZfYnlfaWQmY3Q9Zw/gwZoQmiNyymp12vukB/giphy.gif"
 LIMBO_TAKEOFF_GIF = "https://media3.giphy.com/media/v1.Y2lkPTc5MGI3NjExYmFobGx5ZnV1M3h1c204amtpYm9oZXhoOTJkcmY4YzN0N25tenh0aCZlcD12MV9pbnRlcm5hbF9naWZfYnlfaWQmY3Q9Zw/KxHaSWSpTlEGc/giphy.gif"
 LIMBO_BOOM_GIF = "https://media3.giphy.com/media/v1.Y2lkPTc5MGI3NjExem80dXg4NDFqZTJ5YTB5N3VybXdtYmtua2R0aDM4bnNlendxYjgxdCZlcD12MV9pbnRlcm5hbF9naWZfYnlfaWQmY3Q9Zw/Uk0qiMZ1yGkoPABua5/giphy.gif"
 LIMBO_DEFAULT_TARGETS = [1.10, 1.50, 2.00, 3.00, 5.00, -1.0]
+_LIMBO_PWIN = {t: _NET_LIMBO / t for t in LIMBO_DEFAULT_TARGETS if t > 0}
 _limbo_active_sessions: set[int] = set()
 
 # ---- PF State (in-memory for example) ----
-_pf_state: dict[int, dict] = {}
+_pf_state: dict[int, PFState] = {}
 
 
-def limbo_pf_new_commitment(user_id: int) -> dict:
+def limbo_pf_new_commitment(user_id: int) -> PFState:
     server_seed = secrets.token_hex(32)
-    server_hash = hashlib.sha256(server_seed.encode()).hexdigest()
+    server_seed_b = server_seed.encode()
+    server_hash = hashlib.sha256(server_seed_b).hexdigest()
     client_seed = f"{user_id}-{int(time.time())}-{secrets.token_hex(4)}"
-    _pf_state[user_id] = {
-        "server_seed": server_seed,
-        "server_hash": server_hash,
-        "client_seed": client_seed,
-        "nonce": 0
-    }
+    _pf_state[user_id] = PFState(server_seed, server_seed_b, server_hash,
+                                 client_seed)
     return _pf_state[user_id]
 
 
-def limbo_pf_get_or_create(user_id: int) -> dict:
+def limbo_pf_get_or_create(user_id: int) -> PFState:
     return _pf_state.get(user_id) or limbo_pf_new_commitment(user_id)
 
 
 def limbo_pf_set_client_seed(user_id: int, client_seed: str):
     st = limbo_pf_get_or_create(user_id)
-    st["client_seed"] = client_seed
-    st["nonce"] = 0
+    st.client_seed = client_seed
+    st.nonce = 0
 
 
-def _limbo_pf_hmac_hex(server_seed: str, message: str) -> str:
-    return hmac.new(server_seed.encode(),
-                    msg=message.encode(),
-                    digestmod=hashlib.sha256).hexdigest()
+def _limbo_pf_hmac_hex(server_seed: bytes, message: str) -> str:
+    return hmac.digest(server_seed, message.encode(), "sha256").hex()
 
 
 # ---- Game Math ----
 def limbo_generate_rng(user_id: int) -> float:
     """Return a PF RNG in [0,1) based on seeds."""
     st = limbo_pf_get_or_create(user_id)
-    digest = _limbo_pf_hmac_hex(st["server_seed"],
-                                f"{st['client_seed']}:{st['nonce']}")
+    digest = _limbo_pf_hmac_hex(st.server_seed_b,
+                                f"{st.client_seed}:{st.nonce}")
     n = int(digest[:13], 16)
     return n / float(1 << 52)
 
 
+def _recompute_limbo_rng(server_seed: str, client_seed: str,
+                         nonce: int) -> float:
+    digest = _limbo_pf_hmac_hex(server_seed.encode(), f"{client_seed}:{nonce}")
+    return int(digest[:13], 16) / float(1 << 52)
+
+
 def limbo_payout_amount(wager: float, target: float, win: bool) -> float:
-    return (wager * target * (1.0 - LIMBO_HOUSE_EDGE)) if win else 0.0
+    return (wager * target * _NET_LIMBO) if win else 0.0
 
 
 # ---- UI ----
+_LIMBO_SELECT_OPTIONS = [
+    discord.SelectOption(label=f"{t:.2f}×", value=str(t))
+    for t in LIMBO_DEFAULT_TARGETS if t > 0
+] + [discord.SelectOption(label="Custom…", value="custom")]
+
+
 class LimboMultiplierSelect(discord.ui.Select):
 
     def __init__(self, owner_id: int):
-        opts = [
-            discord.SelectOption(label=f"{t:.2f}×", value=str(t))
-            for t in LIMBO_DEFAULT_TARGETS if t > 0
-        ]
-        opts.append(discord.SelectOption(label="Custom…", value="custom"))
-        super().__init__(placeholder="Pick multiplier", options=opts)
+        # Shallow copy: the Select keeps (and may append to) its own list
+        super().__init__(placeholder="Pick multiplier",
+                         options=list(_LIMBO_SELECT_OPTIONS))
         self.owner_id = owner_id
         self.selected_target: Optional[float] = None
 
@@ -3086,17 +3727,12 @@ class LimboRollButton(discord.ui.Button):
         try:
             target = self.select.selected_target
             u = fetch_user(self.owner_id)
+            bot_balance = fetch_user(interaction.client.user.id)["balance"]
             if u["balance"] < self.wager:
                 return await interaction.response.send_message(
                     "❌ Not enough QC.", ephemeral=True)
-            # Deduct wager
-            update_balance(self.owner_id, -self.wager)
-            update_balance(interaction.client.user.id, self.wager)
-            update_stats(self.owner_id, total_wagered=self.wager)
-            if (self.wager * target * (1 - LIMBO_HOUSE_EDGE)) > fetch_user(
-                    interaction.client.user.id)["balance"]:
-                update_balance(self.owner_id, self.wager)
-                update_balance(interaction.client.user.id, -self.wager)
+            # Refuse targets the bot could not pay even with the wager in hand
+            if (self.wager * target * _NET_LIMBO) > bot_balance + self.wager:
                 return await interaction.response.send_message(
                     "❌ Bot can't cover payout. Contact admin anus_69 and dont delete this messgae.",
                     ephemeral=True)
@@ -3106,7 +3742,7 @@ class LimboRollButton(discord.ui.Button):
             rng = limbo_generate_rng(self.owner_id)
 
             # Target p(win) ~ (0.99 / target) for ~50% win near 2×
-            p_win = (0.99 / target)
+            p_win = _LIMBO_PWIN.get(target) or (_NET_LIMBO / target)
             win = rng <= p_win
 
             # Visual crash point (for fun only)
@@ -3114,13 +3750,15 @@ class LimboRollButton(discord.ui.Button):
                 max(1.00, rng * target), 2)
 
             payout = limbo_payout_amount(self.wager, target, win)
-            if win and payout > 0:
-                update_balance(self.owner_id, payout)
-                update_balance(interaction.client.user.id, -payout)
-                update_stats(self.owner_id,
-                             net_profit_loss=payout - self.wager)
-            else:
-                update_stats(self.owner_id, net_profit_loss=-self.wager)
+            status = settle_round(self.owner_id, interaction.client.user.id,
+                                  self.wager, payout)
+            if status == "user_funds":
+                return await interaction.response.send_message(
+                    "❌ Not enough QC.", ephemeral=True)
+            if status == "bot_funds":
+                return await interaction.response.send_message(
+                    "❌ Bot can't cover payout. Contact admin anus_69 and dont delete this messgae.",
+                    ephemeral=True)
 
             # Build result embed
             embed = discord.Embed(
@@ -3137,13 +3775,13 @@ class LimboRollButton(discord.ui.Button):
             embed.add_field(
                 name="PF Reveal",
                 value=
-                f"server_seed: `{st['server_seed']}`\nserver_hash: `{st['server_hash']}`\nclient_seed: `{st['client_seed']}`\nnonce: `{st['nonce']}`",
+                f"server_seed: `{st.server_seed}`\nserver_hash: `{st.server_hash}`\nclient_seed: `{st.client_seed}`\nnonce: `{st.nonce}`",
                 inline=False)
             embed.set_footer(
                 text=
                 f"House edge {LIMBO_HOUSE_EDGE*100:.0f}% | Win chance ≈ {p_win*100:.1f}%"
             )
-            st["nonce"] += 1  # increment after use
+            st.nonce += 1  # increment after use
 
             for c in self.view.children:
                 c.disabled = True
@@ -3162,8 +3800,8 @@ class LimboView(discord.ui.View):
         self.add_item(LimboRollButton(owner_id, wager, select))
 
     async def on_timeout(self):
-        for c in self.children:
-            c.disabled = True
+        # Nothing re-renders the message, so flipping children is wasted work
+        self.stop()
 
 
 # ---- Commands ----
@@ -3182,10 +3820,10 @@ async def limbo_cmd(ctx, amount: float):
     )
     embed.set_image(url=LIMBO_IDLE_GIF)
     embed.add_field(name="PF Server Hash",
-                    value=f"`{st['server_hash']}`",
+                    value=f"`{st.server_hash}`",
                     inline=False)
     embed.add_field(name="Client Seed",
-                    value=f"`{st['client_seed']}` (change with !limbo_seed)",
+                    value=f"`{st.client_seed}` (change with !limbo_seed)",
                     inline=False)
     await ctx.send(embed=embed, view=LimboView(ctx.author.id, amount))
 
@@ -3196,7 +3834,7 @@ async def limbo_seed_cmd(ctx, *, client_seed: str):
         return await ctx.send("❌ Invalid seed.")
     limbo_pf_set_client_seed(ctx.author.id, client_seed.strip())
     st = limbo_pf_get_or_create(ctx.author.id)
-    await ctx.send(f"✅ Seed set. Server hash: `{st['server_hash']}`")
+    await ctx.send(f"✅ Seed set. Server hash: `{st.server_hash}`")
 
 
 @bot.command(name="limbo_verify")
@@ -3212,7 +3850,8 @@ async def limbo_verify_cmd(ctx):
     # Step 1 — Ask for server_seed
     await ctx.send("🔍 Please input **server seed** (from PF Reveal):")
     try:
-        msg = await bot.wait_for("message", check=check_author, timeout=60)
+        async with asyncio.timeout(60):
+            msg = await bot.wait_for("message", check=check_author)
         server_seed = msg.content.strip()
     except asyncio.TimeoutError:
         return await ctx.send("⏰ Timed out waiting for server seed.")
@@ -3220,7 +3859,8 @@ async def limbo_verify_cmd(ctx):
     # Step 2 — Ask for client_seed
     await ctx.send("📥 Please input **client seed** (from PF Reveal):")
     try:
-        msg = await bot.wait_for("message", check=check_author, timeout=60)
+        async with asyncio.timeout(60):
+            msg = await bot.wait_for("message", check=check_author)
         client_seed = msg.content.strip()
     except asyncio.TimeoutError:
         return await ctx.send("⏰ Timed out waiting for client seed.")
@@ -3228,7 +3868,8 @@ async def limbo_verify_cmd(ctx):
     # Step 3 — Ask for nonce
     await ctx.send("🔢 Please input **nonce** (number from PF Reveal):")
     try:
-        msg = await bot.wait_for("message", check=check_author, timeout=60)
+        async with asyncio.timeout(60):
+            msg = await bot.wait_for("message", check=check_author)
         nonce = int(msg.content.strip())
     except asyncio.TimeoutError:
         return await ctx.send("⏰ Timed out waiting for nonce.")
@@ -3237,9 +3878,8 @@ async def limbo_verify_cmd(ctx):
 
     # --- Verification ---
     try:
-        digest = _limbo_pf_hmac_hex(server_seed, f"{client_seed}:{nonce}")
-        n = int(digest[:13], 16)
-        rng = n / float(1 << 52)
+        rng = await asyncio.to_thread(_recompute_limbo_rng, server_seed,
+                                      client_seed, nonce)
         await ctx.send(
             f"✅ Verification complete!\n"
             f"**RNG:** `{rng:.10f}`\n"
@@ -3253,13 +3893,17 @@ async def limbo_verify_cmd(ctx):
 #==========================================
 # ========= UNIVERSAL PROVABLY-FAIR CASINO GAMES (1% House Edge baseline) =========
 # Uses existing helpers from your bot:
-# - fetch_user(user_id), update_balance(user_id, delta), update_stats(user_id, **fields)
-# - get_bot_qc_balance(), bot (discord.py)
+# - fetch_user(user_id), settle_round(user_id, bot_id, wager, payout)
+# - bot (discord.py)
 # Wagers are in QC; house edge applied to wins only.
 # PF: HMAC-SHA256(server_seed, f"{client_seed}:{nonce}"), first 13 hex → int.
 
 import hmac, hashlib, secrets, time
-from typing import Dict, Any, List, Optional
+from collections import Counter
+from dataclasses import dataclass, field
+from itertools import count, islice
+from types import MappingProxyType
+from typing import Dict, Any, List, Mapping, Optional
 import discord
 from discord.ext import commands
 
@@ -3267,37 +3911,106 @@ HOUSE_EDGE = 0.01
 
 
 # -------- Shared PF helpers --------
-def _pf_new_commitment(state_dict: dict, user_id: int) -> dict:
+@dataclass(slots=True)
+class PFRecord:
+    """One user's casino state: PF commitment and last bet, keyed by game."""
+    games: Dict[str, dict] = field(default_factory=dict)
+    last: Dict[str, dict] = field(default_factory=dict)
+
+
+_pf: Dict[int, PFRecord] = {}  # user_id -> PFRecord
+
+
+def _pf_record(user_id: int) -> PFRecord:
+    rec = _pf.get(user_id)
+    if rec is None:
+        rec = _pf[user_id] = PFRecord()
+    return rec
+
+
+def _pf_new_commitment(user_id: int, game: str) -> dict:
     server_seed = secrets.token_hex(32)
     server_hash = hashlib.sha256(server_seed.encode()).hexdigest()
     client_seed = f"{user_id}-{int(time.time())}-{secrets.token_hex(4)}"
-    state_dict[user_id] = {
+    st = {
         "server_seed": server_seed,
+        "server_seed_b": server_seed.encode(),
         "server_hash": server_hash,
         "client_seed": client_seed,
+        "client_seed_b": client_seed.encode(),
         "nonce": 0,
     }
-    return state_dict[user_id]
+    _pf_record(user_id).games[game] = st
+    return st
+
 
+def _pf_get_or_create(user_id: int, game: str) -> dict:
+    return (_pf_record(user_id).games.get(game)
+            or _pf_new_commitment(user_id, game))
 
-def _pf_get_or_create(state_dict: dict, user_id: int) -> dict:
-    return state_dict.get(user_id) or _pf_new_commitment(state_dict, user_id)
+
+def _pf_last(user_id: int, game: str) -> Optional[dict]:
+    rec = _pf.get(user_id)
+    return rec.last.get(game) if rec else None
 
 
 def _pf_hmac_int(server_seed: str, msg: str) -> int:
-    h = hmac.new(server_seed.encode(), msg.encode(),
-                 hashlib.sha256).hexdigest()
-    return int(h[:13], 16)
+    """Top 52 bits of the HMAC, i.e. int(hexdigest()[:13], 16)."""
+    d = hmac.digest(server_seed.encode(), msg.encode(), "sha256")
+    return int.from_bytes(d[:7], "big") >> 4
+
+
+def _pf_hmac_int_b(server_seed_b: bytes, client_seed_b: bytes,
+                   nonce: int) -> int:
+    """_pf_hmac_int for in-bot draws, on seeds encoded at commitment time."""
+    d = hmac.digest(server_seed_b, b"%s:%d" % (client_seed_b, nonce),
+                    "sha256")
+    return int.from_bytes(d[:7], "big") >> 4
+
+
+class _PFHasher:
+    """
+    Same values as _pf_hmac_int, for games drawing several nonces under one
+    seed: the HMAC key schedule runs once and each draw copies it.
+    """
+
+    def __init__(self, server_seed: str):
+        self._template = hmac.new(server_seed.encode(), None, hashlib.sha256)
 
+    def digest(self, msg: str) -> bytes:
+        h = self._template.copy()
+        h.update(msg.encode())
+        return h.digest()
 
-def _ensure_funds_or_refund(ctx, user_id: int, wager: float,
-                            needed: float) -> bool:
-    if get_bot_qc_balance() < needed:
-        # Refund wager
-        update_balance(user_id, wager)
-        update_balance(bot.user.id, -wager)
-        return False
-    return True
+    def draw(self, msg: str) -> int:
+        return int.from_bytes(self.digest(msg)[:7], "big") >> 4
+
+
+_PF_MASK_52 = (1 << 52) - 1
+
+
+def _pf_hmac_stream(hasher: _PFHasher, msg: str):
+    """
+    PF v2: endless 13-hex ints, four per HMAC block. Block 0 is
+    HMAC(server_seed, msg), block i is HMAC(server_seed, f"{msg}:{i}"), so
+    the first value equals _pf_hmac_int(server_seed, msg).
+    """
+    for block in count():
+        # first 26 bytes = first 52 hex chars = four 52-bit values
+        x = int.from_bytes(
+            hasher.digest(msg if block == 0 else f"{msg}:{block}")[:26],
+            "big")
+        for shift in (156, 104, 52, 0):
+            yield (x >> shift) & _PF_MASK_52
+
+
+def _pf_hmac_slices(server_seed: str, msg: str, k: int) -> List[int]:
+    return list(islice(_pf_hmac_stream(_PFHasher(server_seed), msg), k))
+
+
+# Colors are immutable, so every result embed shares these two.
+_WIN_COLOR = discord.Color.green()
+_LOSS_COLOR = discord.Color.red()
 
 
 def _format_win_embed(title: str, win: bool, push: bool, wager: float,
@@ -3310,31 +4023,8 @@ def _format_win_embed(title: str, win: bool, push: bool, wager: float,
         return f"💥 Outcome: You lost `{wager:.3f} QC` (Net -{wager:.3f} QC)"
 
 
-# -------- Game registry for !games --------
-_GAME_DESCRIPTIONS: Dict[str, Dict[str, Any]] = {}
-
-
-def _register_game(key: str,
-                   name: str,
-                   aliases: List[str],
-                   desc: str,
-                   usage: str,
-                   emoji: str = "🎮",
-                   group: str = "Games"):
-    _GAME_DESCRIPTIONS[key] = {
-        "name": name,
-        "aliases": aliases,
-        "desc": desc,
-        "usage": usage,
-        "emoji": emoji,
-        "group": group,
-    }
-
-
 # ==============================================================================
 # 1) COINFLIP (aliases: cf)
-_coin_pf_state: Dict[int, dict] = {}
-_last_coinflip: Dict[int, dict] = {}
 
 
 @bot.command(name="coinflip", aliases=["cf"])
@@ -3342,17 +4032,13 @@ async def coinflip_cmd(ctx, amount: float, choice: str):
     choice = choice.lower().strip()
     if choice not in ("heads", "tails"):
         return await ctx.send("❌ Choice must be heads/tails.")
-    u = fetch_user(ctx.author.id)
-    if u["balance"] < amount or amount <= 0:
+    if amount <= 0 or _cached_balance(ctx.author.id) < amount:
         return await ctx.send("❌ Insufficient QC or invalid amount.")
 
-    update_balance(ctx.author.id, -amount)
-    update_balance(bot.user.id, amount)
-    update_stats(ctx.author.id, total_wagered=amount)
-
-    st = _pf_get_or_create(_coin_pf_state, ctx.author.id)
+    st = _pf_get_or_create(ctx.author.id, "coinflip")
     used_nonce = st["nonce"]
-    rng = _pf_hmac_int(st["server_seed"], f"{st['client_seed']}:{used_nonce}")
+    rng = _pf_hmac_int_b(st["server_seed_b"], st["client_seed_b"],
+                         used_nonce)
     st["nonce"] += 1
 
     result = "heads" if (rng % 2 == 0) else "tails"
@@ -3360,21 +4046,20 @@ async def coinflip_cmd(ctx, amount: float, choice: str):
     payout = amount * 2 * (1 - HOUSE_EDGE) if win else 0.0
     net = payout - amount
 
-    if win and payout > 0:
-        if not _ensure_funds_or_refund(ctx, ctx.author.id, amount, payout):
-            return await ctx.send("❌ Bot can't cover payout. Wager refunded.")
-        update_balance(ctx.author.id, payout)
-        update_balance(bot.user.id, -payout)
-        update_stats(ctx.author.id, net_profit_loss=net)
-    else:
-        update_stats(ctx.author.id, net_profit_loss=-amount)
+    status = settle_round(ctx.author.id, bot.user.id, amount, payout)
+    if status == "user_funds":
+        return await ctx.send("❌ Insufficient QC or invalid amount.")
+    if status == "bot_funds":
+        return await ctx.send("❌ Bot can't cover payout. Bet not placed.")
 
-    _last_coinflip[ctx.author.id] = {"amount": amount, "choice": choice}
+    _pf_record(ctx.author.id).last["coinflip"] = {
+        "amount": amount, "choice": choice
+    }
 
     embed = discord.Embed(
         title="🪙 Coinflip",
         description=f"You chose `{choice}`, result: `{result}`",
-        color=discord.Color.green() if win else discord.Color.red())
+        color=_WIN_COLOR if win else _LOSS_COLOR)
     embed.add_field(name="Result",
                     value=_format_win_embed("Coinflip", win, False, amount,
                                             payout, net),
@@ -3393,7 +4078,7 @@ async def coinflip_cmd(ctx, amount: float, choice: str):
 
 @bot.command(name="coinflip_reroll", aliases=["cf_reroll"])
 async def coinflip_reroll_cmd(ctx):
-    last = _last_coinflip.get(ctx.author.id)
+    last = _pf_last(ctx.author.id, "coinflip")
     if not last:
         return await ctx.send("❌ No previous coinflip found for reroll.")
     await coinflip_cmd(ctx, last["amount"], last["choice"])
@@ -3408,37 +4093,21 @@ async def coinflip_verify_cmd(ctx, server_seed: str, client_seed: str,
     await ctx.send(f"✅ Coinflip verify: nonce {nonce} → `{result}`")
 
 
-_register_game(
-    key="coinflip",
-    name="Coinflip",
-    aliases=["cf"],
-    desc="50/50 coin toss; win pays 2× minus 1%.",
-    usage="!coinflip <amount> <heads|tails>",
-    emoji="🪙",
-    group="Quick bets",
-)
-
 # ==============================================================================
 # 2) DICE (roll-under; aliases: d)
-_dice_pf_state: Dict[int, dict] = {}
-_last_dice: Dict[int, dict] = {}
 
 
 @bot.command(name="dice", aliases=["d"])
 async def dice_cmd(ctx, amount: float, target: int):
     if not (2 <= target <= 100):
         return await ctx.send("❌ Target must be 2–100.")
-    u = fetch_user(ctx.author.id)
-    if u["balance"] < amount or amount <= 0:
+    if amount <= 0 or _cached_balance(ctx.author.id) < amount:
         return await ctx.send("❌ Insufficient QC or invalid amount.")
 
-    update_balance(ctx.author.id, -amount)
-    update_balance(bot.user.id, amount)
-    update_stats(ctx.author.id, total_wagered=amount)
-
-    st = _pf_get_or_create(_dice_pf_state, ctx.author.id)
+    st = _pf_get_or_create(ctx.author.id, "dice")
     used_nonce = st["nonce"]
-    rng = _pf_hmac_int(st["server_seed"], f"{st['client_seed']}:{used_nonce}")
+    rng = _pf_hmac_int_b(st["server_seed_b"], st["client_seed_b"],
+                         used_nonce)
     st["nonce"] += 1
 
     roll = (rng % 100) + 1
@@ -3448,21 +4117,20 @@ async def dice_cmd(ctx, amount: float, target: int):
     payout = amount * payout_mult if win else 0.0
     net = payout - amount
 
-    if win and payout > 0:
-        if not _ensure_funds_or_refund(ctx, ctx.author.id, amount, payout):
-            return await ctx.send("❌ Bot can't cover payout. Wager refunded.")
-        update_balance(ctx.author.id, payout)
-        update_balance(bot.user.id, -payout)
-        update_stats(ctx.author.id, net_profit_loss=net)
-    else:
-        update_stats(ctx.author.id, net_profit_loss=-amount)
+    status = settle_round(ctx.author.id, bot.user.id, amount, payout)
+    if status == "user_funds":
+        return await ctx.send("❌ Insufficient QC or invalid amount.")
+    if status == "bot_funds":
+        return await ctx.send("❌ Bot can't cover payout. Bet not placed.")
 
-    _last_dice[ctx.author.id] = {"amount": amount, "target": target}
+    _pf_record(ctx.author.id).last["dice"] = {
+        "amount": amount, "target": target
+    }
 
     embed = discord.Embed(
         title="🎲 Dice (Roll-under)",
         description=f"Roll: `{roll}` vs Target: `{target}`",
-        color=discord.Color.green() if win else discord.Color.red())
+        color=_WIN_COLOR if win else _LOSS_COLOR)
     embed.add_field(name="Result",
                     value=_format_win_embed("Dice", win, False, amount, payout,
                                             net),
@@ -3481,7 +4149,7 @@ async def dice_cmd(ctx, amount: float, target: int):
 
 @bot.command(name="d_reroll", aliases=["dice_reroll"])
 async def dice_reroll_cmd(ctx):
-    last = _last_dice.get(ctx.author.id)
+    last = _pf_last(ctx.author.id, "dice")
     if not last:
         return await ctx.send("❌ No previous dice roll found for reroll.")
     await dice_cmd(ctx, last["amount"], last["target"])
@@ -3499,85 +4167,80 @@ async def dice_verify_cmd(ctx, server_seed: str, client_seed: str, nonce: int,
     )
 
 
-_register_game(
-    key="dice",
-    name="Dice (Roll-under)",
-    aliases=["d"],
-    desc=
-    "Pick target 2–100; win if roll ≤ target. Payout scales by odds, minus 1%.",
-    usage="!dice <amount> <target>",
-    emoji="🎲",
-    group="Quick bets",
-)
-
 # ==============================================================================
 # 3) BLACKJACK (auto 17+; aliases: bj)
-_blackjack_pf_state: Dict[int, dict] = {}
-_last_blackjack: Dict[int, dict] = {}
 
 
-def _bj_draw_value(server_seed: str, client_seed: str, nonce: int) -> int:
-    return (_pf_hmac_int(server_seed, f"{client_seed}:{nonce}") %
-            13) + 1  # 1..13
+def _bj_score(vals: List[int]) -> int:
+    """Hand total with faces counted as 10, capped at 21."""
+    return min(sum(min(c, 10) for c in vals), 21)
 
 
-@bot.command(name="blackjack", aliases=["bj"])
-async def blackjack_cmd(ctx, amount: float):
-    u = fetch_user(ctx.author.id)
-    if u["balance"] < amount or amount <= 0:
-        return await ctx.send("❌ Insufficient QC or invalid amount.")
+def _bj_deal(raw_ints) -> tuple[List[int], List[int]]:
+    """Player, then dealer, draw to 17+ from an iterator of PF ints."""
+    player_vals: List[int] = []
+    dealer_vals: List[int] = []
+    for hand in (player_vals, dealer_vals):
+        total = 0  # running total instead of re-summing the hand per draw
+        while total < 17:
+            c = (next(raw_ints) % 13) + 1  # 1..13
+            hand.append(c)
+            total += min(c, 10)
+    return player_vals, dealer_vals
 
-    update_balance(ctx.author.id, -amount)
-    update_balance(bot.user.id, amount)
-    update_stats(ctx.author.id, total_wagered=amount)
 
-    st = _pf_get_or_create(_blackjack_pf_state, ctx.author.id)
-    used_start = st["nonce"]
+def _bj_play(server_seed: str, client_seed: str,
+             nonce: int) -> tuple[List[int], List[int]]:
+    """PF v2 hand for one nonce; pure, so it can run off the event loop."""
+    return _bj_deal(
+        _pf_hmac_stream(_PFHasher(server_seed), f"{client_seed}:{nonce}"))
 
-    player_vals: List[int] = []
-    n = st["nonce"]
-    while sum(min(c, 10) for c in player_vals) < 17:
-        player_vals.append(
-            _bj_draw_value(st["server_seed"], st["client_seed"], n))
-        n += 1
 
-    dealer_vals: List[int] = []
-    while sum(min(c, 10) for c in dealer_vals) < 17:
-        dealer_vals.append(
-            _bj_draw_value(st["server_seed"], st["client_seed"], n))
-        n += 1
+def _bj_play_v1(server_seed: str, client_seed: str,
+                start_nonce: int) -> tuple[List[int], List[int]]:
+    """Pre-v2 hand: one HMAC per card over consecutive nonces."""
+    hasher = _PFHasher(server_seed)
+    return _bj_deal(
+        hasher.draw(f"{client_seed}:{i}") for i in count(start_nonce))
 
-    st["nonce"] = n
-    used_end = n - 1
 
-    player_score = min(sum(min(c, 10) for c in player_vals), 21)
-    dealer_score = min(sum(min(c, 10) for c in dealer_vals), 21)
+@bot.command(name="blackjack", aliases=["bj"])
+async def blackjack_cmd(ctx, amount: float):
+    if amount <= 0 or _cached_balance(ctx.author.id) < amount:
+        return await ctx.send("❌ Insufficient QC or invalid amount.")
+
+    st = _pf_get_or_create(ctx.author.id, "blackjack")
+    used_nonce = st["nonce"]
+    st["nonce"] += 1  # claim the nonce before yielding to the loop
+    # PF v2: the whole hand comes from one nonce's HMAC stream
+    player_vals, dealer_vals = await asyncio.to_thread(
+        _bj_play, st["server_seed"], st["client_seed"], used_nonce)
+
+    player_score = _bj_score(player_vals)
+    dealer_score = _bj_score(dealer_vals)
     push = (player_score == dealer_score and player_score <= 21)
     win = (player_score <= 21) and (dealer_score > 21
                                     or player_score > dealer_score)
 
     if push:
         payout, net = amount, 0.0
-        update_balance(ctx.author.id, payout)
-        update_balance(bot.user.id, -payout)
-        update_stats(ctx.author.id, net_profit_loss=0.0)
     elif win:
         payout = amount * 2 * (1 - HOUSE_EDGE)
         net = payout - amount
-        if not _ensure_funds_or_refund(ctx, ctx.author.id, amount, payout):
-            return await ctx.send("❌ Bot can't cover payout. Wager refunded.")
-        update_balance(ctx.author.id, payout)
-        update_balance(bot.user.id, -payout)
-        update_stats(ctx.author.id, net_profit_loss=net)
     else:
-        update_stats(ctx.author.id, net_profit_loss=-amount)
         payout, net = 0.0, -amount
 
-    _last_blackjack[ctx.author.id] = {"amount": amount}
+    status = settle_round(ctx.author.id, bot.user.id, amount, payout)
+    if status == "user_funds":
+        return await ctx.send("❌ Insufficient QC or invalid amount.")
+    if status == "bot_funds":
+        return await ctx.send("❌ Bot can't cover payout. Bet not placed.")
+
+    _pf_record(ctx.author.id).last["blackjack"] = {"amount": amount}
 
     embed = discord.Embed(
         title="🂡 Blackjack",
-        color=discord.Color.green() if win else discord.Color.red())
+        color=_WIN_COLOR if win else _LOSS_COLOR)
     embed.add_field(
         name="Your Hand",
         value=f"{[min(c,10) for c in player_vals]} → {player_score}",
@@ -3593,65 +4256,51 @@ async def blackjack_cmd(ctx, amount: float):
     embed.add_field(
         name="PF Proof",
         value=
-        f"server_hash: `{st['server_hash']}`\nclient_seed: `{st['client_seed']}`\nnonce range: `{used_start}..{used_end}`",
+        f"server_hash: `{st['server_hash']}`\nclient_seed: `{st['client_seed']}`\nnonce: `{used_nonce}` (PF v2)",
         inline=False)
     embed.set_footer(
         text=
-        "Verify with !blackjack_verify <server_seed> <client_seed> <start_nonce> • Reroll with !bj_reroll"
+        "Verify with !blackjack_verify <server_seed> <client_seed> <nonce> • Reroll with !bj_reroll"
     )
     await ctx.send(embed=embed)
 
 
 @bot.command(name="bj_reroll", aliases=["blackjack_reroll"])
 async def blackjack_reroll_cmd(ctx):
-    last = _last_blackjack.get(ctx.author.id)
+    last = _pf_last(ctx.author.id, "blackjack")
     if not last:
         return await ctx.send("❌ No previous blackjack found for reroll.")
     await blackjack_cmd(ctx, last["amount"])
 
 
 @bot.command(name="blackjack_verify", aliases=["bj_verify"])
-async def blackjack_verify_cmd(ctx, server_seed: str, client_seed: str,
-                               start_nonce: int):
-    n = int(start_nonce)
-    player_vals: List[int] = []
-    while sum(min(c, 10) for c in player_vals) < 17:
-        player_vals.append(
-            (_pf_hmac_int(server_seed.strip(), f"{client_seed.strip()}:{n}") %
-             13) + 1)
-        n += 1
-    dealer_vals: List[int] = []
-    while sum(min(c, 10) for c in dealer_vals) < 17:
-        dealer_vals.append(
-            (_pf_hmac_int(server_seed.strip(), f"{client_seed.strip()}:{n}") %
-             13) + 1)
-        n += 1
-    end_nonce = n - 1
-    p = min(sum(min(c, 10) for c in player_vals), 21)
-    d = min(sum(min(c, 10) for c in dealer_vals), 21)
+async def blackjack_verify_cmd(ctx,
+                               server_seed: str,
+                               client_seed: str,
+                               nonce: int,
+                               version: int = 2):
+    """Pass version 1 for hands dealt before PF v2 (one nonce per card)."""
+    n = int(nonce)
+    play = _bj_play_v1 if version == 1 else _bj_play
+    player_vals, dealer_vals = await asyncio.to_thread(
+        play, server_seed.strip(), client_seed.strip(), n)
+    if version == 1:
+        nonce_text = f"{n}..{n + len(player_vals) + len(dealer_vals) - 1}"
+    else:
+        nonce_text = f"{n} (PF v2)"
+    p = _bj_score(player_vals)
+    d = _bj_score(dealer_vals)
     push = (p == d and p <= 21)
     win = (p <= 21) and (d > 21 or p > d)
     await ctx.send("✅ Blackjack verify:\n"
                    f"- Player: {[min(c,10) for c in player_vals]} → {p}\n"
                    f"- Dealer: {[min(c,10) for c in dealer_vals]} → {d}\n"
                    f"- Win: {win} • Push: {push}\n"
-                   f"- Nonce range: {start_nonce}..{end_nonce}")
+                   f"- Nonce: {nonce_text}")
 
 
-_register_game(
-    key="blackjack",
-    name="Blackjack",
-    aliases=["bj"],
-    desc="Auto-draw to 17+ vs dealer. Push refunds. 1% cut on wins.",
-    usage="!blackjack <amount>",
-    emoji="🂡",
-    group="Table",
-)
-
 # ==============================================================================
 # 4) HI-LO (aliases: hilo, hl)
-_hilo_pf_state: Dict[int, dict] = {}
-_last_hilo: Dict[int, dict] = {}
 
 
 @bot.command(name="hilo", aliases=["hl"])
@@ -3659,18 +4308,13 @@ async def hilo_cmd(ctx, amount: float, guess: str):
     guess = guess.lower().strip()
     if guess not in ("higher", "lower"):
         return await ctx.send("❌ Guess must be 'higher' or 'lower'.")
-    u = fetch_user(ctx.author.id)
-    if u["balance"] < amount or amount <= 0:
+    if amount <= 0 or _cached_balance(ctx.author.id) < amount:
         return await ctx.send("❌ Insufficient QC or invalid amount.")
 
-    update_balance(ctx.author.id, -amount)
-    update_balance(bot.user.id, amount)
-    update_stats(ctx.author.id, total_wagered=amount)
-
-    st = _pf_get_or_create(_hilo_pf_state, ctx.author.id)
+    st = _pf_get_or_create(ctx.author.id, "hilo")
     used_nonce = st["nonce"]
-    draw = (_pf_hmac_int(st["server_seed"],
-                         f"{st['client_seed']}:{used_nonce}") % 13) + 1
+    draw = (_pf_hmac_int_b(st["server_seed_b"], st["client_seed_b"],
+                           used_nonce) % 13) + 1
     st["nonce"] += 1
 
     win = False if draw == 7 else ((guess == "higher" and draw > 7) or
@@ -3678,21 +4322,18 @@ async def hilo_cmd(ctx, amount: float, guess: str):
     payout = amount * 2 * (1 - HOUSE_EDGE) if win else 0.0
     net = payout - amount
 
-    if win and payout > 0:
-        if not _ensure_funds_or_refund(ctx, ctx.author.id, amount, payout):
-            return await ctx.send("❌ Bot can't cover payout. Wager refunded.")
-        update_balance(ctx.author.id, payout)
-        update_balance(bot.user.id, -payout)
-        update_stats(ctx.author.id, net_profit_loss=net)
-    else:
-        update_stats(ctx.author.id, net_profit_loss=-amount)
+    status = settle_round(ctx.author.id, bot.user.id, amount, payout)
+    if status == "user_funds":
+        return await ctx.send("❌ Insufficient QC or invalid amount.")
+    if status == "bot_funds":
+        return await ctx.send("❌ Bot can't cover payout. Bet not placed.")
 
-    _last_hilo[ctx.author.id] = {"amount": amount, "guess": guess}
+    _pf_record(ctx.author.id).last["hilo"] = {"amount": amount, "guess": guess}
 
     embed = discord.Embed(
         title="⬆⬇ Hi-Lo",
         description=f"Card: `{min(draw,10)}` (raw {draw}) vs guess `{guess}`",
-        color=discord.Color.green() if win else discord.Color.red())
+        color=_WIN_COLOR if win else _LOSS_COLOR)
     embed.add_field(name="Result",
                     value=_format_win_embed("Hi-Lo", win, False, amount,
                                             payout, net),
@@ -3711,7 +4352,7 @@ async def hilo_cmd(ctx, amount: float, guess: str):
 
 @bot.command(name="hl_reroll", aliases=["hilo_reroll"])
 async def hilo_reroll_cmd(ctx):
-    last = _last_hilo.get(ctx.author.id)
+    last = _pf_last(ctx.author.id, "hilo")
     if not last:
         return await ctx.send("❌ No previous Hi-Lo found for reroll.")
     await hilo_cmd(ctx, last["amount"], last["guess"])
@@ -3726,29 +4367,21 @@ async def hilo_verify_cmd(ctx, server_seed: str, client_seed: str, nonce: int):
     )
 
 
-_register_game(
-    key="hilo",
-    name="Hi‑Lo",
-    aliases=["hl"],
-    desc="Guess higher/lower than 7 (7 loses). Win pays 2× minus 1%.",
-    usage="!hilo <amount> <higher|lower>",
-    emoji="🔼",
-    group="Quick bets",
-)
-
 # ==============================================================================
 # 5) ROULETTE (aliases: roulette, r)
-_roulette_pf_state: Dict[int, dict] = {}
-_last_roulette: Dict[int, dict] = {}
 
 _ROUGE = {1, 3, 5, 7, 9, 12, 14, 16, 18, 19, 21, 23, 25, 27, 30, 32, 34, 36}
+# (color, evenodd) for each pocket 0..36
+_ROULETTE_CLASS = tuple(
+    ("green", "zero") if n == 0 else
+    ("red" if n in _ROUGE else "black", "even" if n % 2 == 0 else "odd")
+    for n in range(37))
 
 
 @bot.command(name="roulette", aliases=["r"])
 async def roulette_cmd(ctx, amount: float, bet: str):
     bet = bet.lower().strip()
-    u = fetch_user(ctx.author.id)
-    if u["balance"] < amount or amount <= 0:
+    if amount <= 0 or _cached_balance(ctx.author.id) < amount:
         return await ctx.send("❌ Insufficient QC or invalid amount.")
 
     valid_simple = {"red", "black", "even", "odd"}
@@ -3764,20 +4397,14 @@ async def roulette_cmd(ctx, amount: float, bet: str):
             return await ctx.send(
                 "❌ Bet must be red/black/even/odd or a number 0–36.")
 
-    update_balance(ctx.author.id, -amount)
-    update_balance(bot.user.id, amount)
-    update_stats(ctx.author.id, total_wagered=amount)
-
-    st = _pf_get_or_create(_roulette_pf_state, ctx.author.id)
+    st = _pf_get_or_create(ctx.author.id, "roulette")
     used_nonce = st["nonce"]
-    raw = _pf_hmac_int(st["server_seed"], f"{st['client_seed']}:{used_nonce}")
+    raw = _pf_hmac_int_b(st["server_seed_b"], st["client_seed_b"],
+                         used_nonce)
     st["nonce"] += 1
 
     result_num = raw % 37
-    color = "red" if result_num in _ROUGE else (
-        "black" if result_num != 0 else "green")
-    evenodd = ("even" if result_num != 0 and result_num % 2 == 0 else
-               ("odd" if result_num % 2 == 1 else "zero"))
+    color, evenodd = _ROULETTE_CLASS[result_num]
 
     if num_bet is not None:
         win = (result_num == num_bet)
@@ -3788,22 +4415,19 @@ async def roulette_cmd(ctx, amount: float, bet: str):
 
     net = payout - amount
 
-    if win and payout > 0:
-        if not _ensure_funds_or_refund(ctx, ctx.author.id, amount, payout):
-            return await ctx.send("❌ Bot can't cover payout. Wager refunded.")
-        update_balance(ctx.author.id, payout)
-        update_balance(bot.user.id, -payout)
-        update_stats(ctx.author.id, net_profit_loss=net)
-    else:
-        update_stats(ctx.author.id, net_profit_loss=-amount)
+    status = settle_round(ctx.author.id, bot.user.id, amount, payout)
+    if status == "user_funds":
+        return await ctx.send("❌ Insufficient QC or invalid amount.")
+    if status == "bot_funds":
+        return await ctx.send("❌ Bot can't cover payout. Bet not placed.")
 
-    _last_roulette[ctx.author.id] = {"amount": amount, "bet": bet}
+    _pf_record(ctx.author.id).last["roulette"] = {"amount": amount, "bet": bet}
 
     embed = discord.Embed(
         title="🎡 Roulette",
         description=
         f"Result: `{result_num}` ({color}, {evenodd}) • Your bet: `{bet}`",
-        color=discord.Color.green() if win else discord.Color.red())
+        color=_WIN_COLOR if win else _LOSS_COLOR)
     embed.add_field(name="Result",
                     value=_format_win_embed("Roulette", win, False, amount,
                                             payout, net),
@@ -3822,7 +4446,7 @@ async def roulette_cmd(ctx, amount: float, bet: str):
 
 @bot.command(name="r_reroll", aliases=["roulette_reroll"])
 async def roulette_reroll_cmd(ctx):
-    last = _last_roulette.get(ctx.author.id)
+    last = _pf_last(ctx.author.id, "roulette")
     if not last:
         return await ctx.send("❌ No previous roulette found for reroll.")
     await roulette_cmd(ctx, last["amount"], last["bet"])
@@ -3834,32 +4458,24 @@ async def roulette_verify_cmd(ctx, server_seed: str, client_seed: str,
     raw = _pf_hmac_int(server_seed.strip(),
                        f"{client_seed.strip()}:{int(nonce)}")
     result_num = raw % 37
-    color = "red" if result_num in _ROUGE else (
-        "black" if result_num != 0 else "green")
-    evenodd = ("even" if result_num != 0 and result_num % 2 == 0 else
-               ("odd" if result_num % 2 == 1 else "zero"))
+    color, evenodd = _ROULETTE_CLASS[result_num]
     await ctx.send(
         f"✅ Roulette verify: nonce {nonce} → `{result_num}` ({color}, {evenodd})"
     )
 
 
-_register_game(
-    key="roulette",
-    name="Roulette",
-    aliases=["r"],
-    desc=
-    "Bet red/black/even/odd or a single number. Wins pay standard odds minus 1%.",
-    usage="!roulette <amount> <red|black|even|odd|0-36>",
-    emoji="🎡",
-    group="Table",
-)
-
 # ==============================================================================
 # 6) SLOTS (aliases: slots, sl) — 3-reel, house-favored
-_slots_pf_state: Dict[int, dict] = {}
-_last_slots: Dict[int, dict] = {}
 
 _SLOTS_SYMBOLS = ["🍒", "🍋", "🔔", "💎", "⭐", "7️⃣"]
+_MULT_3X = {
+    "7️⃣": 36.0,
+    "💎": 16.0,
+    "⭐": 9.0,
+    "🔔": 5.0,
+    "🍋": 4.0,
+    "🍒": 4.0,
+}
 
 
 def _slots_payout_multiplier(symbols: List[str]) -> float:
@@ -3870,67 +4486,45 @@ def _slots_payout_multiplier(symbols: List[str]) -> float:
     Net EV ≈ 0.975 after 1% win cut (house edge ≈2.5%).
     If you prefer ~1% edge: use 7️⃣=40, 💎=18, ⭐=10, 🔔=5, 🍋=4, 🍒=4 (EV≈0.99).
     """
-    if len(set(symbols)) == 1:
-        s = symbols[0]
-        return {
-            "7️⃣": 36.0,
-            "💎": 16.0,
-            "⭐": 9.0,
-            "🔔": 5.0,
-            "🍋": 4.0,
-            "🍒": 4.0,
-        }.get(s, 0.0)
-
-    # exact 2-of-a-kind
-    for sym in _SLOTS_SYMBOLS:
-        if symbols.count(sym) == 2:
-            return 1.5
+    top, k = Counter(symbols).most_common(1)[0]
+    if k == 3:
+        return _MULT_3X.get(top, 0.0)
+    if k == 2:  # exact 2-of-a-kind
+        return 1.5
     return 0.0
 
 
 @bot.command(name="slots", aliases=["sl"])
 async def slots_cmd(ctx, amount: float):
-    u = fetch_user(ctx.author.id)
-    if u["balance"] < amount or amount <= 0:
+    if amount <= 0 or _cached_balance(ctx.author.id) < amount:
         return await ctx.send("❌ Insufficient QC or invalid amount.")
 
-    update_balance(ctx.author.id, -amount)
-    update_balance(bot.user.id, amount)
-    update_stats(ctx.author.id, total_wagered=amount)
-
-    st = _pf_get_or_create(_slots_pf_state, ctx.author.id)
+    st = _pf_get_or_create(ctx.author.id, "slots")
     used_nonce = st["nonce"]
-
-    reels = []
-    n = used_nonce
-    for _ in range(3):
-        idx = _pf_hmac_int(st["server_seed"],
-                           f"{st['client_seed']}:{n}") % len(_SLOTS_SYMBOLS)
-        reels.append(_SLOTS_SYMBOLS[idx])
-        n += 1
-    st["nonce"] = n
-    end_nonce = n - 1
+    # PF v2: all three reels come from one HMAC
+    reels = [
+        _SLOTS_SYMBOLS[r % len(_SLOTS_SYMBOLS)] for r in _pf_hmac_slices(
+            st["server_seed"], f"{st['client_seed']}:{used_nonce}", 3)
+    ]
+    st["nonce"] += 1
 
     mult = _slots_payout_multiplier(reels)
     payout = amount * mult * (1 - HOUSE_EDGE) if mult > 0 else 0.0
     net = payout - amount
     win = payout > 0
 
-    if win:
-        if not _ensure_funds_or_refund(ctx, ctx.author.id, amount, payout):
-            return await ctx.send("❌ Bot can't cover payout. Wager refunded.")
-        update_balance(ctx.author.id, payout)
-        update_balance(bot.user.id, -payout)
-        update_stats(ctx.author.id, net_profit_loss=net)
-    else:
-        update_stats(ctx.author.id, net_profit_loss=-amount)
+    status = settle_round(ctx.author.id, bot.user.id, amount, payout)
+    if status == "user_funds":
+        return await ctx.send("❌ Insufficient QC or invalid amount.")
+    if status == "bot_funds":
+        return await ctx.send("❌ Bot can't cover payout. Bet not placed.")
 
-    _last_slots[ctx.author.id] = {"amount": amount}
+    _pf_record(ctx.author.id).last["slots"] = {"amount": amount}
 
     embed = discord.Embed(
         title="🎰 Slots",
         description=f"Result: {' | '.join(reels)}",
-        color=discord.Color.green() if win else discord.Color.red())
+        color=_WIN_COLOR if win else _LOSS_COLOR)
     embed.add_field(name="Result",
                     value=_format_win_embed("Slots", win, False, amount,
                                             payout, net),
@@ -3938,53 +4532,45 @@ async def slots_cmd(ctx, amount: float):
     embed.add_field(
         name="PF Proof",
         value=
-        f"server_hash: `{st['server_hash']}`\nclient_seed: `{st['client_seed']}`\nnonce range: `{used_nonce}..{end_nonce}`",
+        f"server_hash: `{st['server_hash']}`\nclient_seed: `{st['client_seed']}`\nnonce: `{used_nonce}` (PF v2)",
         inline=False)
     embed.set_footer(
         text=
-        "Verify with !slots_verify <server_seed> <client_seed> <start_nonce> | Reroll with !sl_reroll"
+        "Verify with !slots_verify <server_seed> <client_seed> <nonce> | Reroll with !sl_reroll"
     )
     await ctx.send(embed=embed)
 
 
 @bot.command(name="sl_reroll", aliases=["slots_reroll"])
 async def slots_reroll_cmd(ctx):
-    last = _last_slots.get(ctx.author.id)
+    last = _pf_last(ctx.author.id, "slots")
     if not last:
         return await ctx.send("❌ No previous slots found for reroll.")
     await slots_cmd(ctx, last["amount"])
 
 
 @bot.command(name="slots_verify", aliases=["sl_verify"])
-async def slots_verify_cmd(ctx, server_seed: str, client_seed: str,
-                           start_nonce: int):
-    reels = []
-    n = int(start_nonce)
-    for _ in range(3):
-        idx = _pf_hmac_int(server_seed.strip(),
-                           f"{client_seed.strip()}:{n}") % len(_SLOTS_SYMBOLS)
-        reels.append(_SLOTS_SYMBOLS[idx])
-        n += 1
-    end_nonce = n - 1
-    await ctx.send(
-        f"✅ Slots verify: reels {' | '.join(reels)} • nonce range {start_nonce}..{end_nonce}"
-    )
-
+async def slots_verify_cmd(ctx,
+                           server_seed: str,
+                           client_seed: str,
+                           nonce: int,
+                           version: int = 2):
+    """Pass version 1 for spins made before PF v2 (one nonce per reel)."""
+    n = int(nonce)
+    client_seed = client_seed.strip()
+    if version == 1:
+        hasher = _PFHasher(server_seed.strip())
+        raws = [hasher.draw(f"{client_seed}:{i}") for i in range(n, n + 3)]
+        nonce_text = f"nonce range {n}..{n + 2}"
+    else:
+        raws = _pf_hmac_slices(server_seed.strip(), f"{client_seed}:{n}", 3)
+        nonce_text = f"nonce {n} (PF v2)"
+    reels = [_SLOTS_SYMBOLS[r % len(_SLOTS_SYMBOLS)] for r in raws]
+    await ctx.send(f"✅ Slots verify: reels {' | '.join(reels)} • {nonce_text}")
 
-_register_game(
-    key="slots",
-    name="Slots",
-    aliases=["sl"],
-    desc="3-reel Slots. 3× and 2× matches pay; 1% cut on wins.",
-    usage="!slots <amount>",
-    emoji="🎰",
-    group="Machines",
-)
 
 # ==============================================================================
 # 7) WHEEL (aliases: wheel, wh) — tuned for ~1% edge
-_wheel_pf_state: Dict[int, dict] = {}
-_last_wheel: Dict[int, dict] = {}
 
 # Uniform segments sum to 6.0 → mean=1.0 → net EV≈0.99 after 1% cut
 _WHEEL_SEGMENTS = [0.2, 0.4, 0.7, 1.0, 1.6, 2.1]
@@ -3992,19 +4578,13 @@ _WHEEL_SEGMENTS = [0.2, 0.4, 0.7, 1.0, 1.6, 2.1]
 
 @bot.command(name="wheel", aliases=["wh"])
 async def wheel_cmd(ctx, amount: float):
-    u = fetch_user(ctx.author.id)
-    if u["balance"] < amount or amount <= 0:
+    if amount <= 0 or _cached_balance(ctx.author.id) < amount:
         return await ctx.send("❌ Insufficient QC or invalid amount.")
 
-    update_balance(ctx.author.id, -amount)
-    update_balance(bot.user.id, amount)
-    update_stats(ctx.author.id, total_wagered=amount)
-
-    st = _pf_get_or_create(_wheel_pf_state, ctx.author.id)
+    st = _pf_get_or_create(ctx.author.id, "wheel")
     used_nonce = st["nonce"]
-    idx = _pf_hmac_int(
-        st["server_seed"],
-        f"{st['client_seed']}:{used_nonce}") % len(_WHEEL_SEGMENTS)
+    idx = _pf_hmac_int_b(st["server_seed_b"], st["client_seed_b"],
+                         used_nonce) % len(_WHEEL_SEGMENTS)
     st["nonce"] += 1
 
     seg = _WHEEL_SEGMENTS[idx]
@@ -4012,16 +4592,13 @@ async def wheel_cmd(ctx, amount: float):
     net = payout - amount
     win = payout > 0
 
-    if win:
-        if not _ensure_funds_or_refund(ctx, ctx.author.id, amount, payout):
-            return await ctx.send("❌ Bot can't cover payout. Wager refunded.")
-        update_balance(ctx.author.id, payout)
-        update_balance(bot.user.id, -payout)
-        update_stats(ctx.author.id, net_profit_loss=net)
-    else:
-        update_stats(ctx.author.id, net_profit_loss=-amount)
+    status = settle_round(ctx.author.id, bot.user.id, amount, payout)
+    if status == "user_funds":
+        return await ctx.send("❌ Insufficient QC or invalid amount.")
+    if status == "bot_funds":
+        return await ctx.send("❌ Bot can't cover payout. Bet not placed.")
 
-    _last_wheel[ctx.author.id] = {"amount": amount}
+    _pf_record(ctx.author.id).last["wheel"] = {"amount": amount}
 
     embed = discord.Embed(title="🛞 Wheel",
                           description=f"Multiplier landed: `{seg:.2f}×`",
@@ -4044,7 +4621,7 @@ async def wheel_cmd(ctx, amount: float):
 
 @bot.command(name="wh_reroll", aliases=["wheel_reroll"])
 async def wheel_reroll_cmd(ctx):
-    last = _last_wheel.get(ctx.author.id)
+    last = _pf_last(ctx.author.id, "wheel")
     if not last:
         return await ctx.send("❌ No previous wheel found for reroll.")
     await wheel_cmd(ctx, last["amount"])
@@ -4060,35 +4637,18 @@ async def wheel_verify_cmd(ctx, server_seed: str, client_seed: str,
     await ctx.send(f"✅ Wheel verify: nonce {nonce} → `{seg:.2f}×`")
 
 
-_register_game(
-    key="wheel",
-    name="Wheel",
-    aliases=["wh"],
-    desc="Spin and land a multiplier. Uniform segments tuned for ~1% edge.",
-    usage="!wheel <amount>",
-    emoji="🛞",
-    group="Machines",
-)
-
 # ==============================================================================
 # 8) MINES (aliases: mines, mn) — 5x5 grid, 5 mines
-_mines_pf_state: Dict[int, dict] = {}
-_last_mines: Dict[int, dict] = {}
 
 
 @bot.command(name="mines", aliases=["mn"])
 async def mines_cmd(ctx, amount: float, picks: int = 3):
     if not (1 <= picks <= 10):
         return await ctx.send("❌ Picks must be 1–10.")
-    u = fetch_user(ctx.author.id)
-    if u["balance"] < amount or amount <= 0:
+    if amount <= 0 or _cached_balance(ctx.author.id) < amount:
         return await ctx.send("❌ Insufficient QC or invalid amount.")
 
-    update_balance(ctx.author.id, -amount)
-    update_balance(bot.user.id, amount)
-    update_stats(ctx.author.id, total_wagered=amount)
-
-    st = _pf_get_or_create(_mines_pf_state, ctx.author.id)
+    st = _pf_get_or_create(ctx.author.id, "mines")
     used_nonce = st["nonce"]
 
     total_cells = 25
@@ -4098,8 +4658,8 @@ async def mines_cmd(ctx, amount: float, picks: int = 3):
     mines_set = set()
     n = used_nonce
     while len(mines_set) < mine_count:
-        idx = _pf_hmac_int(st["server_seed"],
-                           f"{st['client_seed']}:{n}") % total_cells
+        idx = _pf_hmac_int_b(st["server_seed_b"], st["client_seed_b"],
+                             n) % total_cells
         mines_set.add(idx)
         n += 1
 
@@ -4107,12 +4667,12 @@ async def mines_cmd(ctx, amount: float, picks: int = 3):
     chosen = []
     safe_count = 0
     for _ in range(picks):
-        idx = _pf_hmac_int(st["server_seed"],
-                           f"{st['client_seed']}:{n}") % total_cells
+        idx = _pf_hmac_int_b(st["server_seed_b"], st["client_seed_b"],
+                             n) % total_cells
         n += 1
         while idx in chosen:
-            idx = _pf_hmac_int(st["server_seed"],
-                               f"{st['client_seed']}:{n}") % total_cells
+            idx = _pf_hmac_int_b(st["server_seed_b"], st["client_seed_b"],
+                                 n) % total_cells
             n += 1
         chosen.append(idx)
         if idx not in mines_set:
@@ -4134,16 +4694,13 @@ async def mines_cmd(ctx, amount: float, picks: int = 3):
     payout = amount * mult * (1 - HOUSE_EDGE) if win else 0.0
     net = payout - amount
 
-    if win and payout > 0:
-        if not _ensure_funds_or_refund(ctx, ctx.author.id, amount, payout):
-            return await ctx.send("❌ Bot can't cover payout. Wager refunded.")
-        update_balance(ctx.author.id, payout)
-        update_balance(bot.user.id, -payout)
-        update_stats(ctx.author.id, net_profit_loss=net)
-    else:
-        update_stats(ctx.author.id, net_profit_loss=-amount)
+    status = settle_round(ctx.author.id, bot.user.id, amount, payout)
+    if status == "user_funds":
+        return await ctx.send("❌ Insufficient QC or invalid amount.")
+    if status == "bot_funds":
+        return await ctx.send("❌ Bot can't cover payout. Bet not placed.")
 
-    _last_mines[ctx.author.id] = {"amount": amount, "picks": picks}
+    _pf_record(ctx.author.id).last["mines"] = {"amount": amount, "picks": picks}
 
     grid_display = "".join("💣" if i in mines_set else "🟩"
                            for i in range(total_cells))
@@ -4154,7 +4711,7 @@ async def mines_cmd(ctx, amount: float, picks: int = 3):
         title="💣 Mines",
         description=
         f"Picked {picks} cells • {'SAFE' if win else 'BOOM'}\nGrid (5x5):\n{grid_lines}",
-        color=discord.Color.green() if win else discord.Color.red())
+        color=_WIN_COLOR if win else _LOSS_COLOR)
     embed.add_field(name="Chosen cells",
                     value=", ".join(str(i) for i in chosen),
                     inline=False)
@@ -4176,7 +4733,7 @@ async def mines_cmd(ctx, amount: float, picks: int = 3):
 
 @bot.command(name="mn_reroll", aliases=["mines_reroll"])
 async def mines_reroll_cmd(ctx):
-    last = _last_mines.get(ctx.author.id)
+    last = _pf_last(ctx.author.id, "mines")
     if not last:
         return await ctx.send("❌ No previous mines found for reroll.")
     await mines_cmd(ctx, last["amount"], last["picks"])
@@ -4211,20 +4768,81 @@ async def mines_verify_cmd(ctx, server_seed: str, client_seed: str,
                    f"- Nonce range: {start_nonce}..{end_nonce}")
 
 
-_register_game(
-    key="mines",
-    name="Mines",
-    aliases=["mn"],
-    desc=
-    "Pick safe cells on 5×5 grid with 5 mines. Win pays inverse odds minus 1%.",
-    usage="!mines <amount> [picks=3]",
-    emoji="💣",
-    group="Machines",
-)
-
-
 # ==============================================================================
 # GAMES CATALOG (Compact, Pretty, Includes KENO and LIMBO)
+# -------- Game registry for !games (read-only) --------
+_GAME_DESCRIPTIONS: Mapping[str, Dict[str, Any]] = MappingProxyType({
+    "coinflip": {
+        "name": "Coinflip",
+        "aliases": ["cf"],
+        "desc": "50/50 coin toss; win pays 2× minus 1%.",
+        "usage": "!coinflip <amount> <heads|tails>",
+        "emoji": "🪙",
+        "group": "Quick bets",
+    },
+    "dice": {
+        "name": "Dice (Roll-under)",
+        "aliases": ["d"],
+        "desc":
+        "Pick target 2–100; win if roll ≤ target. Payout scales by odds, minus 1%.",
+        "usage": "!dice <amount> <target>",
+        "emoji": "🎲",
+        "group": "Quick bets",
+    },
+    "blackjack": {
+        "name": "Blackjack",
+        "aliases": ["bj"],
+        "desc": "Auto-draw to 17+ vs dealer. Push refunds. 1% cut on wins.",
+        "usage": "!blackjack <amount>",
+        "emoji": "🂡",
+        "group": "Table",
+    },
+    "hilo": {
+        "name": "Hi‑Lo",
+        "aliases": ["hl"],
+        "desc": "Guess higher/lower than 7 (7 loses). Win pays 2× minus 1%.",
+        "usage": "!hilo <amount> <higher|lower>",
+        "emoji": "🔼",
+        "group": "Quick bets",
+    },
+    "roulette": {
+        "name": "Roulette",
+        "aliases": ["r"],
+        "desc":
+        "Bet red/black/even/odd or a single number. Wins pay standard odds minus 1%.",
+        "usage": "!roulette <amount> <red|black|even|odd|0-36>",
+        "emoji": "🎡",
+        "group": "Table",
+    },
+    "slots": {
+        "name": "Slots",
+        "aliases": ["sl"],
+        "desc": "3-reel Slots. 3× and 2× matches pay; 1% cut on wins.",
+        "usage": "!slots <amount>",
+        "emoji": "🎰",
+        "group": "Machines",
+    },
+    "wheel": {
+        "name": "Wheel",
+        "aliases": ["wh"],
+        "desc":
+        "Spin and land a multiplier. Uniform segments tuned for ~1% edge.",
+        "usage": "!wheel <amount>",
+        "emoji": "🛞",
+        "group": "Machines",
+    },
+    "mines": {
+        "name": "Mines",
+        "aliases": ["mn"],
+        "desc":
+        "Pick safe cells on 5×5 grid with 5 mines. Win pays inverse odds minus 1%.",
+        "usage": "!mines <amount> [picks=3]",
+        "emoji": "💣",
+        "group": "Machines",
+    },
+})
+
+
 @bot.command(name="games")
 async def games_cmd(ctx):
     # Group by category for readability
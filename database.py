@@ -26,9 +26,11 @@ _log = logging.getLogger("quanta.database")
 _PRAGMAS: Tuple[Tuple[str, Any], ...] = (
     ("journal_mode", "wal"),
     ("foreign_keys", 1),
-    ("synchronous", 1),
-    ("cache_size", 8192),
+    ("synchronous", "NORMAL"),
+    ("cache_size", -65536),
     ("busy_timeout", 5000),
+    ("temp_store", "MEMORY"),
+    ("mmap_size", 268435456),
 )
 
 # -----------------------------------------------------------------------------
@@ -103,6 +105,13 @@ def _ensure_columns(conn: sqlite3.Connection) -> None:
     if not _column_exists(conn, "users", "last_deposit_at"):
         conn.execute("ALTER TABLE users ADD COLUMN last_deposit_at TEXT")
         _log.info("Added missing column: last_deposit_at")
+    if not _column_exists(conn, "users", "last_deposit_at_ts"):
+        # Epoch mirror of last_deposit_at, backfilled once from the ISO strings
+        conn.execute("ALTER TABLE users ADD COLUMN last_deposit_at_ts INTEGER")
+        conn.execute(
+            "UPDATE users SET last_deposit_at_ts = CAST(strftime('%s', last_deposit_at) AS INTEGER) "
+            "WHERE last_deposit_at IS NOT NULL")
+        _log.info("Added missing column: last_deposit_at_ts")
     if not _column_exists(conn, "users", "total_sol_deposited"):
         conn.execute(
             "ALTER TABLE users ADD COLUMN total_sol_deposited REAL NOT NULL DEFAULT 0"
@@ -139,7 +148,8 @@ def get_conn() -> sqlite3.Connection:
         first = not Path(DB_PATH).exists()
         _conn = sqlite3.connect(DB_PATH,
                                 isolation_level=None,
-                                check_same_thread=False)
+                                check_same_thread=False,
+                                cached_statements=256)
         _conn.row_factory = sqlite3.Row
         for pragma, val in _PRAGMAS:
             _conn.execute(f"PRAGMA {pragma} = {val}")
@@ -154,6 +164,7 @@ def get_conn() -> sqlite3.Connection:
             _ensure_guild_access_schema()
             _withdraw_init_schema()
             ensure_lottery_tables()
+            ensure_user_prefs_table()
         except Exception as e:
             _log.error(f"Schema initialization failed: {e}")
             raise
@@ -177,6 +188,14 @@ def _transaction() -> Generator[sqlite3.Cursor, None, None]:
         raise
 
 
+def optimize_db() -> None:
+    """Refresh planner statistics; cheap to call periodically and at shutdown."""
+    try:
+        get_conn().execute("PRAGMA optimize")
+    except sqlite3.Error as e:
+        _log.warning(f"PRAGMA optimize failed: {e}")
+
+
 # =============================================================================
 # USER API
 # =============================================================================
@@ -318,9 +337,10 @@ def record_user_deposit(user_id: int, lamports: int, signature: str,
             UPDATE users
             SET total_sol_deposited = total_sol_deposited + ?,
                 last_deposit_signature = ?,
-                last_deposit_at = ?
+                last_deposit_at = ?,
+                last_deposit_at_ts = CAST(strftime('%s', ?) AS INTEGER)
             WHERE user_id = ?
-            """, (sol_amount, signature, iso_time, user_id))
+            """, (sol_amount, signature, iso_time, iso_time, user_id))
 
 
 # -----------------------------------------------------------------------------
@@ -373,7 +393,8 @@ def get_conn() -> sqlite3.Connection:
         first = not Path(DB_PATH).exists()
         _conn = sqlite3.connect(DB_PATH,
                                 isolation_level=None,
-                                check_same_thread=False)
+                                check_same_thread=False,
+                                cached_statements=256)
         _conn.row_factory = sqlite3.Row
         for pragma, val in _PRAGMAS:
             _conn.execute(f"PRAGMA {pragma} = {val}")
@@ -435,6 +456,18 @@ def ensure_lottery_tables():
         """)
 
 
+def ensure_user_prefs_table():
+    """Per-user settings (profile privacy) read by the bot commands."""
+    conn = get_conn()
+    with conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS user_prefs (
+                user_id INTEGER PRIMARY KEY,
+                private INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+
+
 def record_transaction(user_id: int,
                        type_: str,
                        category: str,
@@ -644,9 +677,14 @@ def get_conn():
         first = not Path(DB_PATH).exists()
         _conn = sqlite3.connect(DB_PATH,
                                 isolation_level=None,
-                                check_same_thread=False)
+                                check_same_thread=False,
+                                cached_statements=256)
         _conn.row_factory = sqlite3.Row
+        for pragma, val in _PRAGMAS:
+            _conn.execute(f"PRAGMA {pragma} = {val}")
         if first: _init_schema(_conn)
+        _ensure_columns(_conn)
+        ensure_user_prefs_table()
     return _conn
 
 
@@ -785,6 +823,20 @@ def guild_mark_grandfathered(guild_id: int):
             (int(guild_id), int(time.time())))
 
 
+def bulk_mark_grandfathered(guild_ids: list[int]):
+    """
+    Grandfather many guilds in a single transaction (one commit for the lot).
+    """
+    if not guild_ids:
+        return
+    _ensure_guild_access_schema()
+    now = int(time.time())
+    with _transaction() as cur:
+        cur.executemany(
+            "INSERT OR IGNORE INTO guild_grandfathered (guild_id, noted_at) VALUES (?, ?)",
+            [(int(gid), now) for gid in guild_ids])
+
+
 def guild_is_grandfathered(guild_id: int) -> bool:
     _ensure_guild_access_schema()
     conn = get_conn()
@@ -823,6 +875,28 @@ def guild_mark_bypass(guild_id: int, by_user_id: int):
             (int(guild_id), int(by_user_id), int(time.time())))
 
 
+def guild_grandfathered_ids() -> set[int]:
+    """
+    All grandfathered guild IDs in one query (used to warm the paywall cache).
+    """
+    _ensure_guild_access_schema()
+    conn = get_conn()
+    rows = conn.execute("SELECT guild_id FROM guild_grandfathered").fetchall()
+    return {int(r[0]) for r in rows}
+
+
+def guild_paid_ids() -> set[int]:
+    """
+    All guild IDs with status 'paid' or 'bypass' in one query.
+    """
+    _ensure_guild_access_schema()
+    conn = get_conn()
+    rows = conn.execute(
+        "SELECT guild_id FROM guild_access WHERE status IN ('paid', 'bypass')"
+    ).fetchall()
+    return {int(r[0]) for r in rows}
+
+
 def guild_access_status(guild_id: int) -> Optional[dict]:
     """
     Return status dict or None.
@@ -1133,9 +1207,11 @@ _log = logging.getLogger("quanta.database")
 _PRAGMAS: Tuple[Tuple[str, Any], ...] = (
     ("journal_mode", "wal"),
     ("foreign_keys", 1),
-    ("synchronous", 1),
-    ("cache_size", 8192),
+    ("synchronous", "NORMAL"),
+    ("cache_size", -65536),
     ("busy_timeout", 5000),
+    ("temp_store", "MEMORY"),
+    ("mmap_size", 268435456),
 )
 
 # SQLite globals
@@ -1191,6 +1267,12 @@ def _ensure_columns(conn: sqlite3.Connection) -> None:
         conn.execute(
             "ALTER TABLE users ADD COLUMN loan_banned INTEGER NOT NULL DEFAULT 0"
         )
+    if not _column_exists(conn, "users", "last_deposit_at_ts"):
+        conn.execute("ALTER TABLE users ADD COLUMN last_deposit_at_ts INTEGER")
+        if _column_exists(conn, "users", "last_deposit_at"):
+            conn.execute(
+                "UPDATE users SET last_deposit_at_ts = CAST(strftime('%s', last_deposit_at) AS INTEGER) "
+                "WHERE last_deposit_at IS NOT NULL")
 
 
 def _init_rewards_table(conn: sqlite3.Connection) -> None:
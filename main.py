@@ -158,9 +158,11 @@ DB_PATH = "quanta.db"
 PRAGMAS: Tuple[Tuple[str, Any], ...] = (
     ("journal_mode", "wal"),
     ("foreign_keys", 1),
-    ("synchronous", 1),
-    ("cache_size", 8192),
+    ("synchronous", "NORMAL"),
+    ("cache_size", -65536),
     ("busy_timeout", 5000),
+    ("temp_store", "MEMORY"),
+    ("mmap_size", 268435456),
 )
 _lock = threading.Lock()
 _conn: Optional[sqlite3.Connection] = None
@@ -172,7 +174,8 @@ def get_conn() -> sqlite3.Connection:
         first = not Path(DB_PATH).exists()
         _conn = sqlite3.connect(DB_PATH,
                                 isolation_level=None,
-                                check_same_thread=False)
+                                check_same_thread=False,
+                                cached_statements=256)
         _conn.row_factory = sqlite3.Row
         for pragma, val in PRAGMAS:
             _conn.execute(f"PRAGMA {pragma} = {val}")